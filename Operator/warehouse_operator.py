@@ -1,123 +1,346 @@
+import numpy as np
 from collections import defaultdict
+from models.instance_data import ranges
 
-def move_to_cheaper_warehouse(solution, data):
+def move_to_cheaper_warehouse(solution, data, budget=None, store_ids=None):
     """
     Operator 1: Move store assignments to cheaper warehouses
+    Targets come from the store's candidate list (all warehouses if none of
+    them is feasible) and are ranked with the cost engine's move deltas,
+    which include the fixed cost of opening the target or closing the
+    source warehouse; the best improving target is taken.
+    store_ids (1-based, ascending) limits the scan to those stores, e.g.
+    the ones stores_to_revisit() reports after other changes.
+    Every evaluated target is charged to budget, and the scan stops early
+    once it has expired.
     Returns: (updated solution, improvement_made)
     """
     improved = False
-    
-    for store_id in list(solution.store_assignments.keys()):
-     
-        current_assigns = solution.store_assignments[store_id].copy()
-        
-        for w_from, qty in current_assigns:
-            current_cost = qty * solution.data.stores[store_id-1].supply_costs[w_from-1]
-       
-            for wh in solution.data.warehouses:
-                w_to = wh.id
-                if w_to == w_from:
-                    continue
-                
-            
-                if solution.warehouse_info[w_to]['remaining'] < qty:
-                    continue 
-                store_incompat = solution.data.incompatibilities.get(store_id, set())
-                if store_incompat & solution.warehouse_info[w_to]['assigned_stores']:
-                    continue 
-                new_cost = qty * solution.data.stores[store_id-1].supply_costs[w_to-1]
-                
-                if new_cost < current_cost:
-                
-                    solution.store_assignments[store_id].remove((w_from, qty))
-                    solution.store_assignments[store_id].append((w_to, qty))
-                  
-                    solution.warehouse_info[w_from]['remaining'] += qty
-                    solution.warehouse_info[w_from]['assigned_stores'].discard(store_id)
-                    solution.warehouse_info[w_to]['remaining'] -= qty
-                    solution.warehouse_info[w_to]['assigned_stores'].add(store_id)
-                    
-                  
-                    if len(solution.warehouse_info[w_from]['assigned_stores']) == 0:
-                        if w_from in solution.used_warehouses:
-                            solution.used_warehouses.remove(w_from)
-                        if w_from not in solution.unused_warehouses:
-                            solution.unused_warehouses.append(w_from)
-                    if w_to in solution.unused_warehouses:
-                        solution.unused_warehouses.remove(w_to)
-                    if w_to not in solution.used_warehouses:
-                        solution.used_warehouses.append(w_to)
-                    
-                    improved = True
-                    break 
-        
+    engine = solution.cost_engine()
+    stores, warehouses, quantities = engine.all_assignments(store_ids)
+
+    for store_id, w_from, qty in zip(stores.tolist(), warehouses.tolist(), quantities.tolist()):
+        if budget is not None and budget.expired():
+            break
+        if engine.quantity(store_id, w_from) != qty:
+            continue
+
+        targets = engine.feasible_targets(store_id, qty, exclude=w_from - 1)
+        if not len(targets):
+            continue
+        deltas = engine.move_deltas(store_id, w_from, qty, targets)
+        if budget is not None:
+            budget.charge(len(targets))
+        best = np.argmin(deltas)
+        if deltas[best] >= 0:
+            continue
+
+        w_to = int(targets[best]) + 1
+        solution.move(store_id, w_from, w_to, qty)
+        improved = True
+
     return solution, improved
 
-def operator_swap_store_assignments(solution, data):
+def stores_to_revisit(solution, data, store_ids, w_ids):
+    """
+    Boolean vector over the 0-based stores for which move_to_cheaper_warehouse
+    may find something new after changes to the 1-based store_ids and w_ids
+    (e.g. from validator.touched): the changed stores, their incompatible
+    neighbours, the stores served by a changed warehouse and the stores that
+    have a changed warehouse in their candidate list (every store if there
+    are no candidate lists). A store none of these reach keeps the same
+    candidate targets and deltas, so it still has no improving move there;
+    only its fallback to all warehouses, used when no candidate fits, is
+    not tracked.
+    """
+    dirty = np.zeros(data.num_stores, dtype=np.bool_)
+    if not len(w_ids):
+        return dirty
+    stores = np.asarray(store_ids, dtype=np.int64) - 1
+    warehouses = np.asarray(w_ids, dtype=np.int64) - 1
+    dirty[stores] = True
+
+    dirty[data.incompatible_neighbors_of(stores)[0]] = True
+
+    dirty |= np.isin(solution.cost_engine().assign_wh, warehouses).any(axis=1)
+    mask = data.candidate_mask()
+    if mask is None:
+        dirty[:] = True
+    else:
+        dirty |= mask[:, warehouses].any(axis=1)
+    return dirty
+
+def operator_swap_store_assignments(solution, data, budget=None):
     """
     Operator 2: Swap assignments between two stores to reduce costs
+    Store s1 sends its quantity from w1 to w2 and store s2 sends its quantity
+    from w2 to w1. Only promising pairs are looked at: w2 must be in the
+    candidate list of s1 and w1 in that of s2, found through an index of the
+    assignments by warehouse. The scan starts at solution.swap_cursor, the
+    store of the last improvement, and wraps around; the first improving,
+    feasible pair (by swap delta) is applied and becomes the new cursor.
+    Evaluations are charged to budget as in move_to_cheaper_warehouse.
     Returns: (updated solution, improvement_made)
     """
     improved = False
-    store_ids = list(solution.store_assignments.keys())
-    
-    for i in range(len(store_ids)):
-        for j in range(i+1, len(store_ids)):
-            s1, s2 = store_ids[i], store_ids[j]
-            
-          
-            if s2 in data.incompatibilities.get(s1, set()):
+    engine = solution.cost_engine()
+    a_store, a_wh, a_qty = engine.all_assignments()
+    flat = list(zip(a_store.tolist(), a_wh.tolist(), a_qty.tolist()))
+    remaining = engine.remaining()
+    candidates = data.candidate_lists()
+    in_candidates = data.candidate_mask()
+
+    # assignments grouped by warehouse: by_wh[wh_ptr[w]:wh_ptr[w + 1]] are those at 0-based w
+    by_wh = np.argsort(a_wh, kind='stable')
+    wh_ptr = np.searchsorted(a_wh[by_wh], np.arange(1, data.num_warehouses + 2))
+
+    start = int(np.searchsorted(a_store, solution.swap_cursor))
+    for i in list(range(start, len(flat))) + list(range(start)):
+        if budget is not None and budget.expired():
+            break
+        s1, w1, q1 = flat[i]
+
+        if candidates is None:
+            partners = np.arange(len(flat))
+        else:
+            targets = candidates[s1 - 1]
+            partners = by_wh[ranges(wh_ptr[targets], wh_ptr[targets + 1])]
+            partners = partners[in_candidates[a_store[partners] - 1, w1 - 1]]
+        partners = partners[(a_store[partners] > s1) & (a_wh[partners] != w1)]
+        if not len(partners):
+            continue
+
+        s2s, w2s, q2s = a_store[partners], a_wh[partners], a_qty[partners]
+        deltas = engine.swap_deltas(s1, w1, q1, s2s, w2s, q2s)
+        if budget is not None:
+            budget.charge(len(partners))
+        feasible = (
+            (deltas < 0) &
+            (remaining[w1 - 1] + q1 >= q2s) &
+            (remaining[w2s - 1] + q2s >= q1)
+        )
+        found = partners[feasible]
+        if not len(found):
+            continue
+
+        s1_incompat = data.incompatibilities.get(s1, set())
+        for j in found.tolist():
+            s2, w2, q2 = flat[j]
+            if s2 in s1_incompat:
                 continue
-                
-          
-            for a1 in solution.store_assignments[s1].copy():
-                w1, q1 = a1
-                for a2 in solution.store_assignments[s2].copy():
-                    w2, q2 = a2
-                    
-                    if w1 == w2:
-                        continue 
-                    wh1_cap = solution.warehouse_info[w1]['remaining'] + q1 >= q2
-                    wh2_cap = solution.warehouse_info[w2]['remaining'] + q2 >= q1
-                    
-                    if wh1_cap and wh2_cap:
-                      
-                        current_cost = (
-                            q1 * solution.data.stores[s1-1].supply_costs[w1-1] +
-                            q2 * solution.data.stores[s2-1].supply_costs[w2-1]
-                        )
-                        
-                    
-                        new_cost = (
-                            q2 * solution.data.stores[s1-1].supply_costs[w1-1] +
-                            q1 * solution.data.stores[s2-1].supply_costs[w2-1]
-                        )
-                        
-                        if new_cost < current_cost:
-                          
-                            solution.store_assignments[s1].remove((w1, q1))
-                            solution.store_assignments[s2].remove((w2, q2))
-                            solution.store_assignments[s1].append((w2, q2))
-                            solution.store_assignments[s2].append((w1, q1))
-                            
-                          
-                            solution.warehouse_info[w1]['remaining'] += q1 - q2
-                            solution.warehouse_info[w2]['remaining'] += q2 - q1
-                            
-                          
-                            solution.warehouse_info[w1]['assigned_stores'].discard(s1)
-                            solution.warehouse_info[w1]['assigned_stores'].add(s2)
-                            solution.warehouse_info[w2]['assigned_stores'].discard(s2)
-                            solution.warehouse_info[w2]['assigned_stores'].add(s1)
-                            
-                            improved = True
-                            break  
-                
-                if improved:
-                    break
-            if improved:
-                break
+            if not engine.is_compatible(s1, w2) or not engine.is_compatible(s2, w1):
+                continue
+
+            solution.swap(s1, w1, q1, s2, w2, q2)
+            solution.swap_cursor = s1
+            improved = True
+            break
+
         if improved:
             break
-    
+
+    return solution, improved
+
+def _trial(solution, apply):
+    """
+    Apply a group of moves through apply(), which returns False when it gets
+    stuck, and keep them only if the objective went down in total.
+    Returns: True when the moves were kept
+    """
+    engine = solution.cost_engine()
+    before = engine.objective
+    owned = solution.journal is None
+    mark = solution.checkpoint()
+    kept = apply() and engine.objective < before
+    if not kept:
+        solution.rollback(mark)
+    if owned:
+        solution.commit()
+    return kept
+
+def operator_close_warehouse(solution, data, budget=None):
+    """
+    Operator 3: Close an open warehouse by moving all of its stores elsewhere
+    A warehouse is only tried when its fixed cost plus the supply cost of its
+    stores exceeds what they would pay at their cheapest other warehouse, so
+    most warehouses are ruled out by one vectorised bound. The stores of a
+    promising warehouse, largest quantity first, each move to the feasible
+    target with the lowest move delta (opening fixed costs included); the
+    closure is kept if the objective went down in total and undone through
+    the move journal otherwise.
+    Returns: (updated solution, improvement_made)
+    """
+    improved = False
+    if data.num_warehouses < 2:
+        return solution, improved  # nowhere to move the stores to
+    engine = solution.cost_engine()
+    a_store, a_wh, a_qty = engine.all_assignments()
+    if not len(a_store):
+        return solution, improved
+    cost = data.supply_cost
+    order = data.cost_order
+
+    # cheapest supply cost of every assignment at any other warehouse
+    cheapest = order[a_store - 1, 0]
+    cheapest = np.where(cheapest == a_wh - 1, order[a_store - 1, 1], cheapest)
+    current = a_qty * cost[a_store - 1, a_wh - 1]
+    elsewhere = a_qty * cost[a_store - 1, cheapest]
+    bound = data.fixed_cost + np.bincount(a_wh - 1, weights=current - elsewhere, minlength=data.num_warehouses)
+    promising = np.flatnonzero(engine.open & (bound > 0))
+    if budget is not None:
+        budget.charge(len(a_store))
+
+    for w in promising[np.argsort(-bound[promising], kind='stable')].tolist():
+        if budget is not None and budget.expired():
+            break
+        if not engine.open[w]:
+            continue
+        w_id = w + 1
+
+        def relocate():
+            members = [(engine.quantity(store_id, w_id), store_id) for store_id in engine.members(w_id).tolist()]
+            for qty, store_id in sorted(members, reverse=True):
+                targets = engine.feasible_targets(store_id, qty, exclude=w)
+                if not len(targets):
+                    return False
+                deltas = engine.move_deltas(store_id, w_id, qty, targets)
+                if budget is not None:
+                    budget.charge(len(targets))
+                solution.move(store_id, w_id, int(targets[np.argmin(deltas)]) + 1, qty)
+            return True
+
+        if _trial(solution, relocate):
+            improved = True
+
+    return solution, improved
+
+def operator_open_warehouse(solution, data, budget=None):
+    """
+    Operator 4: Open a closed warehouse and pull stores into it
+    For every closed warehouse the supply savings of moving assignments there
+    (restricted to stores that have it in their candidate list) are bounded
+    at once, ignoring capacity; warehouses whose bound does not cover their
+    fixed cost are skipped. For the others the assignments with the largest
+    savings move in while capacity and incompatibilities allow, and the
+    opening is kept if the objective went down in total, fixed costs of the
+    opened and of any emptied warehouse included.
+    Returns: (updated solution, improvement_made)
+    """
+    improved = False
+    engine = solution.cost_engine()
+    a_store, a_wh, a_qty = engine.all_assignments()
+    closed = np.flatnonzero(~engine.open)
+    if not len(a_store) or not len(closed):
+        return solution, improved
+    cost = data.supply_cost
+
+    # savings[i, j]: supply cost saved by moving assignment i to closed warehouse j
+    savings = a_qty[:, None] * (cost[a_store - 1, a_wh - 1][:, None] - cost[a_store - 1][:, closed])
+    in_candidates = data.candidate_mask()
+    if in_candidates is not None:
+        savings *= in_candidates[a_store - 1][:, closed]
+    np.maximum(savings, 0, out=savings)
+    bound = savings.sum(axis=0) - data.fixed_cost[closed]
+    if budget is not None:
+        budget.charge(savings.size)
+
+    for j in np.argsort(-bound, kind='stable').tolist():
+        if bound[j] <= 0 or (budget is not None and budget.expired()):
+            break
+        w = int(closed[j])
+        if engine.open[w]:
+            continue
+        w_id = w + 1
+        column = savings[:, j]
+        pulled = np.flatnonzero(column > 0)
+        pulled = pulled[np.argsort(-column[pulled], kind='stable')]
+
+        def pull():
+            for i in pulled.tolist():
+                store_id, w_from, qty = int(a_store[i]), int(a_wh[i]), int(a_qty[i])
+                if engine.quantity(store_id, w_from) != qty:
+                    continue
+                if data.capacity[w] - engine.load[w] < qty or not engine.is_compatible(store_id, w_id):
+                    continue
+                solution.move(store_id, w_from, w_id, qty)
+            return True
+
+        if _trial(solution, pull):
+            improved = True
+
+    return solution, improved
+
+def operator_split_demand(solution, data, budget=None):
+    """
+    Operator 5: Redistribute a store's demand over its cheapest warehouses
+    Any part of a store's quantity may move. For each store the warehouses
+    it could use (its candidate list and the warehouses already serving it,
+    compatible ones only) are ranked by unit supply cost, plus fixed cost
+    over capacity where the warehouse would have to open or would stay open
+    only for this store, and filled in that order up to the store's demand.
+    The exact objective change, fixed costs included, decides; an equal-cost
+    plan is still taken when it serves the store from fewer warehouses, so
+    fragments get consolidated. The plan is applied as partial moves.
+    Returns: (updated solution, improvement_made)
+    """
+    improved = False
+    engine = solution.cost_engine()
+    cost = data.supply_cost
+    candidates = data.candidate_lists()
+
+    for s in range(data.num_stores):
+        if budget is not None and budget.expired():
+            break
+        store_id = s + 1
+        current = engine.assignments(store_id)
+        if not current:
+            continue
+        own = np.zeros(data.num_warehouses, dtype=np.int64)
+        for w_id, qty in current:
+            own[w_id - 1] = qty
+
+        served = np.array([w_id - 1 for w_id, _ in current])
+        options = np.arange(data.num_warehouses) if candidates is None else np.union1d(candidates[s], served)
+        options = options[engine.conflicts[s, options] == 0]
+        room = data.capacity[options] - engine.load[options] + own[options]
+        options, room = options[room > 0], room[room > 0]
+
+        # warehouses whose fixed cost this store alone decides on
+        alone = (engine.count[options] == 0) | ((engine.count[options] == 1) & (own[options] > 0))
+        rank = cost[s, options] + np.where(alone, data.fixed_cost[options] / data.capacity[options], 0)
+        order = np.lexsort((-own[options], rank))
+        options, room, alone = options[order], room[order], alone[order]
+        if budget is not None:
+            budget.charge(len(options))
+
+        demand = int(own.sum())
+        filled = np.cumsum(room)
+        last = int(np.searchsorted(filled, demand))
+        plan = np.zeros(data.num_warehouses, dtype=np.int64)
+        plan[options[:last]] = room[:last]
+        plan[options[last]] = demand - (int(filled[last - 1]) if last else 0)
+
+        delta = int(((plan - own) * cost[s]).sum())
+        delta += int(data.fixed_cost[options[:last + 1]][~engine.open[options[:last + 1]]].sum())
+        dropped = served[plan[served] == 0]
+        delta -= int(data.fixed_cost[dropped][engine.count[dropped] == 1].sum())
+        fragments = int((plan > 0).sum())
+        if delta > 0 or (delta == 0 and fragments >= len(current)):
+            continue
+
+        # move the surplus of every shrinking warehouse into the growing ones
+        gains = [(int(w), int(plan[w] - own[w])) for w in np.flatnonzero(plan > own)]
+        for w_from in np.flatnonzero(own > plan).tolist():
+            surplus = int(own[w_from] - plan[w_from])
+            while surplus:
+                w_to, need = gains[-1]
+                qty = min(surplus, need)
+                solution.move(store_id, w_from + 1, w_to + 1, qty)
+                surplus -= qty
+                if qty == need:
+                    gains.pop()
+                else:
+                    gains[-1] = (w_to, need - qty)
+        improved = True
+
     return solution, improved
@@ -1,57 +1,115 @@
-from collections import defaultdict
 from models.parser import WarehouseParser
 from models.solution import InitialSolution
-
+from models.parallel_search import parallel_iterated_local_search
+from models.memetic import memetic_search
+from models.annealing import simulated_annealing
+from models import validator
+from models.budget import Budget
+from models.instrumentation import Trace, profile
+from models import lp_bound
+from models.elite_archive import EliteArchive, warm_start as load_warm_start
+
+import argparse
+import json
 import os
-import copy
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from Operator.warehouse_operator import move_to_cheaper_warehouse, operator_swap_store_assignments
 
 def validate_solution(solution, data):
+    return validator.validate_solution(solution, data)
 
-    for store_id, assigns in solution.store_assignments.items():
-        total = sum(q for _, q in assigns)
-        store = data.stores[store_id - 1]
-        if total != store.demand:
-            return False, f"Store {store_id} demand not met (required: {store.demand}, got: {total})"
-
-
-    warehouse_usage = defaultdict(int)
-    for store_id, assigns in solution.store_assignments.items():
-        for w_id, qty in assigns:
-            warehouse_usage[w_id] += qty
-    
-    for w_id, used in warehouse_usage.items():
-        warehouse = data.warehouses[w_id - 1]
-        if used > warehouse.capacity:
-            return False, f"Warehouse {w_id} over capacity (capacity: {warehouse.capacity}, used: {used})"
-
-
-    warehouse_assignments = defaultdict(set)
-    for store_id, assigns in solution.store_assignments.items():
-        for w_id, _ in assigns:
-            warehouse_assignments[w_id].add(store_id)
-
-    for w_id, stores in warehouse_assignments.items():
-        for s1 in stores:
-            for s2 in stores:
-                if s2 in data.incompatibilities.get(s1, set()):
-                    return False, f"Incompatible stores {s1} and {s2} both assigned to warehouse {w_id}"
-
-    return True, "Solution is valid"
-
-def optimize_solution_ils(initial_sol, data, max_iter=50):
+def optimize_solution_ils(initial_sol, data, max_iter=50, time_limit=None, max_evaluations=None, verbose=True, trace=None):
     """
     Optimize solution using Iterated Local Search
     """
     best_solution, best_cost, iteration_costs = initial_sol.iterated_local_search(
         max_iterations=max_iter,
         perturbation_strength=0.3,
-        local_search_iterations=100
+        local_search_iterations=100,
+        verbose=verbose,
+        time_limit=time_limit,
+        max_evaluations=max_evaluations,
+        trace=trace
     )
     return best_solution
 
-def optimize_solution(initial_sol, data, max_iter=1000):
-    current_sol = initial_sol
+def optimize_solution_parallel_ils(initial_sol, data, num_workers=None, max_iter=50, time_limit=None, max_evaluations=None,
+                                   verbose=True):
+    """
+    Optimize solution with independent ILS trajectories in a process pool
+    The budgets apply to each trajectory.
+    """
+    best_solution, best_cost, run_stats = parallel_iterated_local_search(
+        data,
+        num_workers=num_workers,
+        initial_solution=initial_sol,
+        max_iterations=max_iter,
+        perturbation_strength=0.3,
+        local_search_iterations=100,
+        time_limit=time_limit,
+        max_evaluations=max_evaluations
+    )
+    log = print if verbose else (lambda *args, **kwargs: None)
+    for stats in run_stats:
+        log(f"  seed {stats['seed']}: best {stats['best_cost']} after {stats['iterations']} iterations in {stats['elapsed']:.1f}s")
+    return best_solution
+
+def optimize_solution_memetic(initial_sol, data, num_workers=1, generations=50, population_size=20, time_limit=None,
+                              verbose=True):
+    """
+    Optimize solution with the memetic algorithm, seeded by initial_sol
+    """
+    best_solution, best_cost, history = memetic_search(
+        data,
+        population_size=population_size,
+        generations=generations,
+        num_workers=num_workers,
+        initial_solution=initial_sol,
+        time_limit=time_limit,
+        verbose=verbose
+    )
+    return best_solution
+
+def optimize_solution_sa(initial_sol, data, max_moves=1000000, time_limit=None, schedule='geometric', verbose=True):
+    """
+    Optimize solution with simulated annealing
+    """
+    best_solution, best_cost, statistics = simulated_annealing(
+        initial_sol,
+        data,
+        max_moves=max_moves,
+        time_limit=time_limit,
+        schedule=schedule,
+        verbose=verbose
+    )
+    return best_solution
+
+# Optimizers selectable with --engine
+ENGINES = ('ils', 'parallel-ils', 'memetic', 'sa')
+
+def run_engine(engine, initial_sol, data, max_iter=50, time_limit=None, verbose=True, trace=None, engine_workers=None):
+    """
+    Optimize initial_sol with one of ENGINES. max_iter is the number of ILS
+    iterations (per trajectory for parallel-ils) or memetic generations;
+    simulated annealing runs its default number of moves. Only ILS fills trace.
+    engine_workers is the process count of parallel-ils (default: one per CPU).
+    """
+    if engine == 'ils':
+        return optimize_solution_ils(initial_sol, data, max_iter, time_limit, verbose=verbose, trace=trace)
+    if engine == 'parallel-ils':
+        return optimize_solution_parallel_ils(initial_sol, data, num_workers=engine_workers, max_iter=max_iter,
+                                              time_limit=time_limit, verbose=verbose)
+    if engine == 'memetic':
+        return optimize_solution_memetic(initial_sol, data, generations=max_iter, time_limit=time_limit, verbose=verbose)
+    if engine == 'sa':
+        return optimize_solution_sa(initial_sol, data, time_limit=time_limit, verbose=verbose)
+    raise ValueError(f"Unknown engine {engine!r}, expected one of {', '.join(ENGINES)}")
+
+def optimize_solution(initial_sol, data, max_iter=1000, time_limit=None, max_evaluations=None):
+    # The operators only apply improving moves, so they can work on one copy in place,
+    # and that copy is also the best solution whenever the budget runs out.
+    budget = Budget.create(None, time_limit, max_evaluations)
+    current_sol = initial_sol.deep_copy()
     best_cost = current_sol.compute_fitness()
     no_improvement_count = 0
     max_no_improvement = 50  
@@ -59,20 +117,21 @@ def optimize_solution(initial_sol, data, max_iter=1000):
     print(f"Starting optimization with initial cost: {best_cost}")
     
     for iteration in range(max_iter):
+        if budget is not None and budget.expired():
+            print(f"Stopping optimization at iteration {iteration}: budget exhausted after {budget.evaluations} evaluations")
+            break
 
         improved1 = False
         for _ in range(5): 
-            new_sol, temp_improved = move_to_cheaper_warehouse(copy.deepcopy(current_sol), data)
+            current_sol, temp_improved = move_to_cheaper_warehouse(current_sol, data, budget)
             if temp_improved:
-                current_sol = new_sol
                 improved1 = True
         
 
         improved2 = False
         for _ in range(5): 
-            new_sol, temp_improved = operator_swap_store_assignments(copy.deepcopy(current_sol), data)
+            current_sol, temp_improved = operator_swap_store_assignments(current_sol, data, budget)
             if temp_improved:
-                current_sol = new_sol
                 improved2 = True
         
 
@@ -92,92 +151,278 @@ def optimize_solution(initial_sol, data, max_iter=1000):
     
     return current_sol
 
-if __name__ == '__main__':
-    input_folder = './inputs'
-    output_folder = './output'  
-    output_folder_ils = './output_ILS'  
-    os.makedirs(output_folder, exist_ok=True)
-    os.makedirs(output_folder_ils, exist_ok=True)
-
-
-    results_summary = []
+def process_instance(input_path, output_folder, output_folder_ils, max_iter=50, verbose=True, time_limit=None, trace=False,
+                     lower_bound=False, lp_seed=False, lp_time_limit=None, warm_start=False, archive_dir=None,
+                     engine='ils', engine_workers=None):
+    """
+    Parse, construct, optimize, validate and save one instance.
+    time_limit bounds the ILS run in seconds; with trace=True the per-iteration
+    ILS statistics are written next to the ILS solution as JSON and CSV.
+    lower_bound solves the LP relaxation and reports its bound and the gap,
+    lp_seed also lets its flow guide the initial solution.
+    warm_start restarts from the best earlier solution that is still valid
+    for the instance (the last ILS solution or the elite archive) instead of
+    constructing one; archive_dir keeps an EliteArchive of the best results.
+    engine picks the optimizer (see ENGINES); tracing applies to ILS only.
+    engine_workers is passed on to run_engine.
+    Returns the summary row for it.
+    """
+    file_name = os.path.basename(input_path)
+    log = print if verbose else (lambda *args, **kwargs: None)
+    log(f"\nProcessing: {file_name}")
 
-    for file_name in os.listdir(input_folder):
-        if not file_name.endswith('.dzn'):
-            continue
 
-        input_path = os.path.join(input_folder, file_name)
-        print(f"\nProcessing: {file_name}")
+    parser = WarehouseParser(input_path)
+    data = parser.parse()
 
 
-        parser = WarehouseParser(input_path)
-        data = parser.parse()
+    relaxation = None
+    if (lower_bound or lp_seed) and lp_bound.available():
+        relaxation = lp_bound.solve_relaxation(data, time_limit=lp_time_limit)
+        log(f"LP relaxation: bound {relaxation.lower_bound} in {relaxation.elapsed:.1f}s ({relaxation.message})")
+    elif lower_bound or lp_seed:
+        log("scipy is not installed, skipping the LP relaxation")
 
+    base_name = file_name.replace('.dzn', '')
+    output_path_ils = os.path.join(output_folder_ils, f"{base_name}_ILS.txt")
+    archive = EliteArchive(archive_dir) if archive_dir else None
 
-        initial_sol = InitialSolution.generate_initial_solution(input_path)
-        initial_cost = initial_sol.compute_fitness()
-        
+    initial_sol = None
+    if warm_start:
+        initial_sol = load_warm_start(data, base_name, previous=output_path_ils, archive=archive)
+        if initial_sol is None:
+            log("No valid earlier solution, constructing one")
+        else:
+            log(f"Warm start from an earlier solution of cost {initial_sol.compute_fitness()}")
+    if initial_sol is None:
+        guide = relaxation.flow if lp_seed and relaxation is not None else None
+        initial_sol = InitialSolution.generate_initial_solution(input_path, data, cost_aware=True, guide=guide)
+    initial_cost = initial_sol.compute_fitness()
+    
 
-        print(f"Using Iterated Local Search optimization...")
-        optimized_sol = optimize_solution_ils(initial_sol, data, max_iter=50)
-        optimized_cost = optimized_sol.compute_fitness()
-        
+    log(f"Using {engine} optimization...")
+    if trace and engine != 'ils':
+        log("Tracing is only available for ILS, running without it")
+    ils_trace = Trace() if trace and engine == 'ils' else None
+    optimized_sol = run_engine(engine, initial_sol, data, max_iter, time_limit, verbose=verbose, trace=ils_trace,
+                               engine_workers=engine_workers)
+    optimized_cost = optimized_sol.compute_fitness()
+    
 
-        is_valid, message = validate_solution(optimized_sol, data)
-        print(f"Optimized solution validation: {is_valid} - {message}")
-        print(f"Initial cost: {initial_cost}")
-        print(f"Optimized cost: {optimized_cost}")
-        improvement = initial_cost - optimized_cost
-        improvement_pct = (improvement / initial_cost) * 100
-        print(f"Total improvement: {improvement} ({improvement_pct:.2f}%)")
+    is_valid, message = validate_solution(optimized_sol, data)
+    log(f"Optimized solution validation: {is_valid} - {message}")
+    log(f"Initial cost: {initial_cost}")
+    log(f"Optimized cost: {optimized_cost}")
+    improvement = initial_cost - optimized_cost
+    improvement_pct = (improvement / initial_cost) * 100
+    log(f"Total improvement: {improvement} ({improvement_pct:.2f}%)")
 
 
-        output_path = os.path.join(output_folder, f"opt_{file_name}.txt")
-        optimized_sol.write_results(output_path)
-        print(f"Solution saved to {output_path}")
+    output_path = os.path.join(output_folder, f"opt_{file_name}.txt")
+    optimized_sol.write_results(output_path)
+    log(f"Solution saved to {output_path}")
 
 
-        base_name = file_name.replace('.dzn', '')
-        output_path_ils = os.path.join(output_folder_ils, f"{base_name}_ILS.txt")
-        optimized_sol.write_results(output_path_ils)
-        print(f"ILS solution saved to {output_path_ils}")
-        
+    optimized_sol.write_results(output_path_ils)
+    log(f"ILS solution saved to {output_path_ils}")
 
-        results_summary.append({
-            'instance': base_name,
-            'initial_cost': initial_cost,
-            'ils_cost': optimized_cost,
-            'improvement': improvement,
-            'improvement_pct': improvement_pct,
-            'valid': is_valid
-        })
+    if archive is not None and is_valid:
+        archive.add(base_name, optimized_sol)
 
+    if ils_trace is not None:
+        ils_trace.to_json(os.path.join(output_folder_ils, f"{base_name}_trace.json"))
+        ils_trace.to_csv(os.path.join(output_folder_ils, f"{base_name}_trace.csv"))
+    
 
+    return {
+        'instance': base_name,
+        'initial_cost': initial_cost,
+        'ils_cost': optimized_cost,
+        'improvement': improvement,
+        'improvement_pct': improvement_pct,
+        'valid': is_valid,
+        'lower_bound': relaxation.lower_bound if relaxation is not None else None,
+        'gap_pct': relaxation.gap(optimized_cost) if relaxation is not None else None
+    }
+
+def write_summary_header(f):
+    f.write("Iterated Local Search Results Summary\n")
+    f.write("=" * 50 + "\n\n")
+    f.write(f"{'Instance':<12} {'Initial':<10} {'ILS Cost':<10} {'Improvement':<12} {'%':<8} {'Valid':<6} "
+            f"{'LP Bound':<10} {'Gap %':<8}\n")
+    f.write("-" * 89 + "\n")
+
+def write_summary_row(f, result):
+    # rows from a sweep without the LP bound have no bound or gap
+    bound = result.get('lower_bound')
+    gap = result.get('gap_pct')
+    f.write(f"{result['instance']:<12} {result['initial_cost']:<10} {result['ils_cost']:<10} "
+           f"{result['improvement']:<12} {result['improvement_pct']:<7.2f}% {result['valid']:<6} "
+           f"{'-' if bound is None else bound:<10} {'-' if gap is None else f'{gap:.2f}%':<8}\n")
+
+def write_summary_totals(f, results_summary):
+    total_initial = sum(result['initial_cost'] for result in results_summary)
+    total_ils = sum(result['ils_cost'] for result in results_summary)
+
+    f.write("-" * 89 + "\n")
+    total_improvement = total_initial - total_ils
+    total_improvement_pct = (total_improvement / total_initial) * 100 if total_initial else 0.0
+    f.write(f"{'TOTAL':<12} {total_initial:<10} {total_ils:<10} "
+           f"{total_improvement:<12} {total_improvement_pct:<7.2f}%\n")
+    return total_improvement_pct
+
+def load_progress(progress_path, output_folder_ils, options):
+    """
+    Results of instances finished by an interrupted earlier sweep run with
+    the same options, whose ILS solution file still exists
+    """
+    done = {}
+    if not os.path.exists(progress_path):
+        return done
+    with open(progress_path) as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue  # a row cut short by an interrupted run
+            if result.pop('options', None) != options:
+                continue
+            if os.path.exists(os.path.join(output_folder_ils, f"{result['instance']}_ILS.txt")):
+                done[result['instance']] = result
+    return done
+
+def run_batch(input_folder='./inputs', output_folder='./output', output_folder_ils='./output_ILS',
+              workers=None, max_iter=50, resume=True, time_limit=None, trace=False,
+              lower_bound=False, lp_seed=False, warm_start=False, archive=True,
+              engine='ils', lp_time_limit=None):
+    """
+    Process every .dzn in input_folder in a process pool.
+
+    Instances are submitted largest file first so the longest ones start
+    immediately. Each finished row is appended to the summary and to a
+    JSON-lines progress file as soon as it arrives, together with the run
+    options; with resume=True instances an interrupted sweep with the same
+    options recorded there are skipped. The summary is rewritten in
+    instance order with totals once everything has finished, and the
+    progress file is then removed, so only an interrupted sweep is resumed.
+    An instance that fails is reported and skipped; the progress file is
+    then kept, so the next run retries only the failed instances.
+    With archive=True the best solutions of every instance are kept in
+    output_folder_ils/elite; warm_start re-optimises every instance from its
+    best earlier solution, so repeated complete sweeps build on each other.
+    lp_time_limit bounds each LP relaxation solve in seconds.
+    parallel-ils runs a process pool of its own, so the CPUs are split
+    between the two pools: without workers, instances run one at a time and
+    each gets every CPU, otherwise each gets cpu_count // workers.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    os.makedirs(output_folder_ils, exist_ok=True)
     summary_path = os.path.join(output_folder_ils, 'ILS_Results_Summary.txt')
-    with open(summary_path, 'w') as f:
-        f.write("Iterated Local Search Results Summary\n")
-        f.write("=" * 50 + "\n\n")
-        f.write(f"{'Instance':<12} {'Initial':<10} {'ILS Cost':<10} {'Improvement':<12} {'%':<8} {'Valid':<6}\n")
-        f.write("-" * 70 + "\n")
-        
-        total_initial = 0
-        total_ils = 0
-        
+    progress_path = os.path.join(output_folder_ils, 'ILS_Results_Progress.jsonl')
+    archive_dir = os.path.join(output_folder_ils, 'elite') if archive else None
+
+    if not resume and os.path.exists(progress_path):
+        os.remove(progress_path)
+    # everything that changes the result of an instance; rows recorded under other options are redone
+    options = {'max_iter': max_iter, 'time_limit': time_limit, 'lower_bound': lower_bound,
+               'lp_seed': lp_seed, 'lp_time_limit': lp_time_limit, 'warm_start': warm_start, 'engine': engine}
+    done = load_progress(progress_path, output_folder_ils, options)
+
+    pending = [
+        os.path.join(input_folder, file_name)
+        for file_name in os.listdir(input_folder)
+        if file_name.endswith('.dzn') and file_name.replace('.dzn', '') not in done
+    ]
+    pending.sort(key=os.path.getsize, reverse=True)
+    if done:
+        print(f"Resuming: {len(done)} instances already finished, {len(pending)} to go")
+
+    results_summary = list(done.values())
+    failed = []
+    with open(summary_path, 'w') as summary, open(progress_path, 'a') as progress:
+        write_summary_header(summary)
         for result in results_summary:
-            f.write(f"{result['instance']:<12} {result['initial_cost']:<10} {result['ils_cost']:<10} "
-                   f"{result['improvement']:<12} {result['improvement_pct']:<7.2f}% {result['valid']:<6}\n")
-            total_initial += result['initial_cost']
-            total_ils += result['ils_cost']
-        
-        f.write("-" * 70 + "\n")
-        total_improvement = total_initial - total_ils
-        total_improvement_pct = (total_improvement / total_initial) * 100
-        f.write(f"{'TOTAL':<12} {total_initial:<10} {total_ils:<10} "
-               f"{total_improvement:<12} {total_improvement_pct:<7.2f}%\n")
-    
+            write_summary_row(summary, result)
+        summary.flush()
+
+        engine_workers = None
+        if engine == 'parallel-ils':
+            cpus = os.cpu_count() or 1
+            workers = workers or 1
+            engine_workers = max(1, cpus // workers)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(process_instance, path, output_folder, output_folder_ils, max_iter, verbose=False,
+                            time_limit=time_limit, trace=trace, lower_bound=lower_bound, lp_seed=lp_seed,
+                            lp_time_limit=lp_time_limit, warm_start=warm_start, archive_dir=archive_dir,
+                            engine=engine, engine_workers=engine_workers): path
+                for path in pending
+            }
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except KeyboardInterrupt:
+                    raise
+                except BaseException as error:  # includes the SystemExit of the parser on a malformed file
+                    failed.append(os.path.basename(futures[future]))
+                    print(f"{failed[-1]}: failed ({type(error).__name__}: {error})")
+                    continue
+                results_summary.append(result)
+                write_summary_row(summary, result)
+                summary.flush()
+                progress.write(json.dumps(dict(result, options=options)) + "\n")
+                progress.flush()
+                print(f"{result['instance']}: {result['initial_cost']} -> {result['ils_cost']} "
+                      f"({result['improvement_pct']:.2f}%), valid: {result['valid']}")
+
+    results_summary.sort(key=lambda result: result['instance'])
+    with open(summary_path, 'w') as summary:
+        write_summary_header(summary)
+        for result in results_summary:
+            write_summary_row(summary, result)
+        total_improvement_pct = write_summary_totals(summary, results_summary)
+    if not failed:
+        # the sweep is complete: the next run starts over instead of resuming it
+        os.remove(progress_path)
+
     print(f"\n" + "=" * 50)
     print(f"Original solutions saved to {output_folder}/")
     print(f"ILS Results Summary saved to {summary_path}")
     print(f"All ILS solutions saved to {output_folder_ils}/")
     print(f"Total instances processed: {len(results_summary)}")
-    print(f"Overall improvement: {total_improvement_pct:.2f}%")
\ No newline at end of file
+    print(f"Overall improvement: {total_improvement_pct:.2f}%")
+    if failed:
+        print(f"Failed instances ({len(failed)}), retried on the next run: {', '.join(sorted(failed))}")
+    return results_summary
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description="Optimize every instance in ./inputs")
+    arg_parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per CPU, one for --engine parallel-ils)")
+    arg_parser.add_argument('--max-iter', type=int, default=50, help="ILS iterations or memetic generations per instance")
+    arg_parser.add_argument('--time-limit', type=float, default=None, help="ILS wall-clock budget per instance in seconds")
+    arg_parser.add_argument('--fresh', action='store_true', help="ignore results of a previous, interrupted sweep")
+    arg_parser.add_argument('--trace', action='store_true', help="write per-iteration ILS statistics for every instance")
+    arg_parser.add_argument('--profile', metavar='INSTANCE', help="run only this .dzn under cProfile")
+    arg_parser.add_argument('--lower-bound', action='store_true', help="report the LP relaxation bound and gap (needs scipy)")
+    arg_parser.add_argument('--lp-seed', action='store_true', help="guide the initial solution by the LP relaxation (needs scipy)")
+    arg_parser.add_argument('--lp-time-limit', type=float, default=None, help="time limit per LP relaxation solve in seconds")
+    arg_parser.add_argument('--warm-start', action='store_true', help="re-optimise every instance from its best earlier solution (last ILS output or elite archive)")
+    arg_parser.add_argument('--no-archive', action='store_true', help="do not keep the elite archive in ./output_ILS/elite")
+    arg_parser.add_argument('--engine', choices=ENGINES, default='ils', help="optimizer to run on every instance (default: ils)")
+    args = arg_parser.parse_args()
+
+    if args.profile:
+        os.makedirs('./output', exist_ok=True)
+        os.makedirs('./output_ILS', exist_ok=True)
+        base_name = os.path.basename(args.profile).replace('.dzn', '')
+        profile(process_instance, args.profile, './output', './output_ILS', args.max_iter,
+                time_limit=args.time_limit, trace=args.trace, lower_bound=args.lower_bound, lp_seed=args.lp_seed,
+                lp_time_limit=args.lp_time_limit, warm_start=args.warm_start,
+                archive_dir=None if args.no_archive else './output_ILS/elite', engine=args.engine,
+                output=f"./output_ILS/{base_name}.prof")
+    else:
+        run_batch(workers=args.workers, max_iter=args.max_iter, resume=not args.fresh,
+                  time_limit=args.time_limit, trace=args.trace, lower_bound=args.lower_bound, lp_seed=args.lp_seed,
+                  warm_start=args.warm_start, archive=not args.no_archive, engine=args.engine,
+                  lp_time_limit=args.lp_time_limit)
@@ -0,0 +1,214 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from models.parser import WarehouseParser
+from models.solution import InitialSolution
+from models.budget import Budget
+from Operator.warehouse_operator import (move_to_cheaper_warehouse, operator_swap_store_assignments,
+                                         operator_close_warehouse, operator_open_warehouse, operator_split_demand)
+
+
+INSTANCES = ['toy'] + [f'wlp{i:02d}' for i in range(1, 9)]
+DEFAULT_BASELINE = './benchmarks/baseline.json'
+DEFAULT_OUTPUT = './benchmarks/latest.json'
+
+SEED = 12345
+FITNESS_REPEATS = 100
+# Time differences below this many seconds are treated as noise when comparing
+NOISE_FLOOR = 0.005
+
+
+def _seed():
+    random.seed(SEED)
+    np.random.seed(SEED)
+
+
+def _parse(input_path):
+    # the parser reports every file it reads; keep that out of the output and the timing
+    with contextlib.redirect_stdout(io.StringIO()):
+        return WarehouseParser(input_path, cache_dir=None).parse()
+
+
+def _stages(input_path, data, initial, config):
+    """
+    (name, setup, run) for every benchmarked stage of one instance. setup
+    prepares untimed inputs, run(*inputs) returns (cost, evaluations).
+    """
+    def parse():
+        parsed = _parse(input_path)
+        return None, parsed.num_stores * parsed.num_warehouses
+
+    def construct():
+        solution = InitialSolution.generate_initial_solution(None, data, cost_aware=True)
+        return solution.engine.objective, data.num_stores
+
+    def fitness():
+        for _ in range(FITNESS_REPEATS):
+            cost = initial.compute_fitness()
+        return cost, FITNESS_REPEATS
+
+    def fresh_copy():
+        _seed()
+        return (initial.deep_copy(), Budget())
+
+    def operator(op):
+        def run(solution, budget):
+            op(solution, data, budget)
+            return solution.engine.objective, budget.evaluations
+        return run
+
+    def ils(solution, budget):
+        _, best_cost, _ = solution.iterated_local_search(
+            max_iterations=config['ils_iterations'],
+            perturbation_strength=0.3,
+            local_search_iterations=config['local_search_iterations'],
+            verbose=False,
+            budget=budget
+        )
+        return best_cost, budget.evaluations
+
+    no_setup = lambda: ()
+    return [
+        ('parse', no_setup, parse),
+        ('construct', no_setup, construct),
+        ('compute_fitness', no_setup, fitness),
+        ('move_to_cheaper_warehouse', fresh_copy, operator(move_to_cheaper_warehouse)),
+        ('operator_swap_store_assignments', fresh_copy, operator(operator_swap_store_assignments)),
+        ('operator_close_warehouse', fresh_copy, operator(operator_close_warehouse)),
+        ('operator_open_warehouse', fresh_copy, operator(operator_open_warehouse)),
+        ('operator_split_demand', fresh_copy, operator(operator_split_demand)),
+        ('ils', fresh_copy, ils),
+    ]
+
+
+def measure(setup, run, repeat):
+    """Best wall time over repeat timed runs, then one more run under tracemalloc for the peak memory"""
+    wall_time = float('inf')
+    for _ in range(repeat):
+        inputs = setup()
+        started = time.perf_counter()
+        cost, evaluations = run(*inputs)
+        wall_time = min(wall_time, time.perf_counter() - started)
+
+    inputs = setup()
+    tracemalloc.start()
+    try:
+        run(*inputs)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'wall_time': wall_time,
+        'evaluations': evaluations,
+        'evaluations_per_sec': evaluations / wall_time if wall_time > 0 else None,
+        'peak_memory': peak_memory,
+        'cost': None if cost is None else int(cost),
+    }
+
+
+def run_benchmarks(instances, input_folder='./inputs', repeat=3, ils_iterations=5, local_search_iterations=100):
+    config = {
+        'seed': SEED,
+        'repeat': repeat,
+        'ils_iterations': ils_iterations,
+        'local_search_iterations': local_search_iterations,
+    }
+    records = []
+    for instance in instances:
+        input_path = os.path.join(input_folder, f"{instance}.dzn")
+        data = _parse(input_path)
+        initial = InitialSolution.generate_initial_solution(None, data, cost_aware=True)
+
+        for stage, setup, run in _stages(input_path, data, initial, config):
+            # the ILS run is long and seeded, one timed run is enough
+            record = measure(setup, run, 1 if stage == 'ils' else repeat)
+            record = {'instance': instance, 'stage': stage, **record}
+            records.append(record)
+            print(f"{instance:<8} {stage:<32} {record['wall_time']:>9.4f}s "
+                  f"{record['peak_memory'] / 2 ** 20:>8.2f} MiB  cost {record['cost']}")
+
+    return {
+        'config': config,
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+        },
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'records': records,
+    }
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    Regressions of results against baseline: a stage that got slower or
+    needs more memory by more than tolerance (relative), or whose final
+    cost changed. Seeds are fixed, so any cost change is a behaviour change.
+    """
+    if results['config'] != baseline['config']:
+        print(f"Warning: baseline was recorded with {baseline['config']}, this run used {results['config']}")
+
+    previous = {(r['instance'], r['stage']): r for r in baseline['records']}
+    regressions = []
+    for record in results['records']:
+        old = previous.get((record['instance'], record['stage']))
+        if old is None:
+            continue
+        name = f"{record['instance']}/{record['stage']}"
+
+        if (record['wall_time'] > old['wall_time'] * (1 + tolerance)
+                and record['wall_time'] - old['wall_time'] > NOISE_FLOOR):
+            regressions.append(f"{name}: wall time {old['wall_time']:.4f}s -> {record['wall_time']:.4f}s")
+        if record['peak_memory'] > old['peak_memory'] * (1 + tolerance):
+            regressions.append(f"{name}: peak memory {old['peak_memory']} -> {record['peak_memory']} bytes")
+        if record['cost'] != old['cost']:
+            regressions.append(f"{name}: cost {old['cost']} -> {record['cost']}")
+    return regressions
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description="Benchmark parser, constructor, fitness, operators and ILS")
+    arg_parser.add_argument('instances', nargs='*', default=INSTANCES, help="instance names (default: all bundled)")
+    arg_parser.add_argument('--inputs', default='./inputs', help="folder with the .dzn files")
+    arg_parser.add_argument('--output', default=DEFAULT_OUTPUT, help="where to write the results JSON")
+    arg_parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    arg_parser.add_argument('--save-baseline', action='store_true', help="store this run as the new baseline")
+    arg_parser.add_argument('--tolerance', type=float, default=0.25, help="allowed relative slowdown / memory growth")
+    arg_parser.add_argument('--repeat', type=int, default=3, help="timed runs per stage (best is kept)")
+    arg_parser.add_argument('--ils-iterations', type=int, default=5, help="ILS iterations per instance")
+    args = arg_parser.parse_args()
+
+    results = run_benchmarks(args.instances, args.inputs, args.repeat, args.ils_iterations)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {args.output}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regressions against {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
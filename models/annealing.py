@@ -0,0 +1,193 @@
+import math
+import random
+
+import numpy as np
+
+from models.budget import Budget
+
+
+def geometric(t0, t_end, progress):
+    return t0 * (t_end / t0) ** progress
+
+
+def linear(t0, t_end, progress):
+    return t0 + (t_end - t0) * progress
+
+
+# Cooling steps the logarithmic schedule spreads over a run
+LOGARITHMIC_STEPS = 1000
+
+
+def logarithmic(t0, t_end, progress):
+    # T = t0 / (1 + c log(1 + k)) over k = 0 .. LOGARITHMIC_STEPS, c chosen to reach t_end at progress 1:
+    # a fast early drop and a long cool tail
+    c = (t0 / t_end - 1) / math.log1p(LOGARITHMIC_STEPS)
+    return t0 / (1 + c * math.log1p(progress * LOGARITHMIC_STEPS))
+
+
+COOLING_SCHEDULES = {
+    'geometric': geometric,
+    'linear': linear,
+    'logarithmic': logarithmic,
+}
+
+# Moves drawn per batch of random numbers; budget and temperature are updated once per batch
+EPOCH = 4096
+# Accepted moves kept for undoing back to the best solution before it is copied instead
+MAX_JOURNAL = 200000
+
+
+def _sampler(engine, data, rng):
+    """
+    Generator of random moves (s, w_from, w_to, qty, delta) with 0-based
+    indices, drawn in O(1) each: a random slot of a random store (retried
+    when the slot is free) and a random warehouse of that store's candidate
+    list. Moves that break capacity or incompatibilities are skipped; when
+    the target cannot take the whole quantity only what fits is moved.
+    """
+    candidates = data.candidate_lists()
+    k = data.num_warehouses if candidates is None else candidates.shape[1]
+    cost, fixed, capacity = data.supply_cost, data.fixed_cost, data.capacity
+    num_stores = data.num_stores
+
+    while True:
+        stores = rng.integers(0, num_stores, EPOCH).tolist()
+        slot_draws = rng.random(EPOCH).tolist()
+        targets = rng.integers(0, k, EPOCH).tolist()
+        for s, slot_draw, target in zip(stores, slot_draws, targets):
+            assign_wh = engine.assign_wh
+            slot = int(slot_draw * assign_wh.shape[1])
+            w = int(assign_wh[s, slot])
+            if w < 0:
+                yield None
+                continue
+            t = target if candidates is None else int(candidates[s, target])
+            if t == w:
+                yield None
+                continue
+            room = int(capacity[t] - engine.load[t])
+            if room <= 0 or engine.conflicts[s, t]:
+                yield None
+                continue
+
+            qty = int(engine.assign_qty[s, slot])
+            q = min(qty, room)
+            delta = q * int(cost[s, t] - cost[s, w])
+            if q == qty and engine.count[w] == 1:
+                delta -= int(fixed[w])
+            if engine.count[t] == 0:
+                delta += int(fixed[t])
+            yield s, w, t, q, delta
+
+
+def initial_temperature(solution, data, samples=1000, acceptance=0.5, seed=None):
+    """
+    Temperature at which the median uphill move from solution is accepted
+    with the given probability. Only the supply cost part of the deltas
+    counts: most random moves open a warehouse, and calibrating on fixed
+    costs would leave the walk hot enough to open warehouses at will.
+    """
+    sampler = _sampler(solution.engine, data, np.random.default_rng(seed))
+    cost = data.supply_cost
+    uphill = []
+    for _ in range(samples * 50):
+        move = next(sampler)
+        if move is None:
+            continue
+        s, w, t, q, _ = move
+        supply = q * int(cost[s, t] - cost[s, w])
+        if supply > 0:
+            uphill.append(supply)
+            if len(uphill) == samples:
+                break
+    if not uphill:
+        return 1.0
+    return -float(np.median(uphill)) / math.log(acceptance)
+
+
+def simulated_annealing(initial_solution, data, max_moves=1000000, time_limit=None, schedule='geometric',
+                        t0=None, t_end=None, seed=None, verbose=True):
+    """
+    Simulated annealing over single moves sampled in O(1) and scored by
+    their exact delta (fixed opening and closing costs included).
+
+    schedule names one of COOLING_SCHEDULES or is a callable
+    (t0, t_end, progress) -> temperature, where progress runs from 0 to 1
+    over max_moves or time_limit, whichever is reached first. t0 defaults
+    to initial_temperature(), t_end to a thousandth of it.
+
+    The walk runs on a copy of initial_solution. The best solution is
+    recovered through the move journal, so a new best costs nothing
+    beyond starting a fresh journal. At least one of max_moves and
+    time_limit must be set, otherwise ValueError is raised.
+    Returns: (best_solution, best_cost, statistics)
+    """
+    if max_moves is None and time_limit is None:
+        raise ValueError("Simulated annealing needs max_moves or time_limit, the walk would never stop")
+    log = print if verbose else (lambda *args, **kwargs: None)
+    cool = COOLING_SCHEDULES[schedule] if isinstance(schedule, str) else schedule
+    rng = np.random.default_rng(seed)
+    uniform = random.Random(seed).random
+    budget = Budget(time_limit, max_moves)
+
+    solution = initial_solution.deep_copy()
+    engine = solution.engine
+    if t0 is None:
+        t0 = initial_temperature(solution, data, seed=seed)
+    if t_end is None:
+        t_end = t0 / 1000
+    log(f"Starting simulated annealing from {engine.objective}, T0 = {t0:.2f}")
+
+    best_cost = engine.objective
+    best_snapshot = None
+    solution.checkpoint()
+    sampler = _sampler(engine, data, rng)
+    temperature = t0
+    accepted = feasible = 0
+
+    while not budget.expired():
+        for _ in range(EPOCH):
+            move = next(sampler)
+            if move is None:
+                continue
+            feasible += 1
+            s, w, t, q, delta = move
+            if delta > 0 and uniform() >= math.exp(-delta / temperature):
+                continue
+
+            solution.move(s + 1, w + 1, t + 1, q)
+            accepted += 1
+            if engine.objective < best_cost:
+                best_cost = engine.objective
+                solution.commit()
+                solution.checkpoint()
+                best_snapshot = None
+            elif solution.journal is not None and len(solution.journal) > MAX_JOURNAL:
+                # too far from the best to keep undoing: copy it out and stop recording
+                best_snapshot = solution.deep_copy()
+                best_snapshot.journal = solution.journal
+                best_snapshot.rollback(0)
+                best_snapshot.commit()
+                solution.commit()
+
+        budget.charge(EPOCH)
+        progress = budget.evaluations / max_moves if max_moves else 0.0
+        if budget.deadline is not None:
+            progress = max(progress, 1 - budget.remaining_time() / time_limit)
+        temperature = max(cool(t0, t_end, min(progress, 1.0)), 1e-9)
+
+    if best_snapshot is None:
+        solution.rollback(0)
+        solution.commit()
+        best_snapshot = solution
+
+    statistics = {
+        'moves': budget.evaluations,
+        'feasible': feasible,
+        'accepted': accepted,
+        'final_temperature': temperature,
+        't0': t0,
+    }
+    log(f"Simulated annealing completed. Best cost: {best_cost} after {budget.evaluations} moves "
+        f"({feasible} feasible, {accepted} accepted)")
+    return best_snapshot, best_cost, statistics
@@ -0,0 +1,41 @@
+import time
+
+
+class Budget:
+    """
+    Wall-clock and move-evaluation limit shared by the optimizers.
+
+    time_limit is in seconds from construction, max_evaluations counts the
+    move deltas the operators evaluate; either may be None for no limit.
+    The operators charge() what they evaluate and poll expired(), which is a
+    counter comparison plus one perf_counter() call, so it is cheap enough
+    for the inner loops.
+    """
+    __slots__ = ('deadline', 'max_evaluations', 'evaluations')
+
+    def __init__(self, time_limit=None, max_evaluations=None):
+        self.deadline = None if time_limit is None else time.perf_counter() + time_limit
+        self.max_evaluations = max_evaluations
+        self.evaluations = 0
+
+    @staticmethod
+    def create(budget=None, time_limit=None, max_evaluations=None):
+        """budget itself when given, else a new Budget, or None when there is no limit at all"""
+        if budget is not None:
+            return budget
+        if time_limit is None and max_evaluations is None:
+            return None
+        return Budget(time_limit, max_evaluations)
+
+    def charge(self, evaluations=1):
+        self.evaluations += evaluations
+
+    def expired(self):
+        if self.max_evaluations is not None and self.evaluations >= self.max_evaluations:
+            return True
+        return self.deadline is not None and time.perf_counter() >= self.deadline
+
+    def remaining_time(self):
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.perf_counter())
@@ -0,0 +1,312 @@
+import numpy as np
+
+
+class CostEngine:
+    """
+    Array-backed solution state with an incremental objective.
+
+    assign_wh / assign_qty are (num_stores x K) slot arrays: slot k of store s
+    serves assign_qty[s, k] units from warehouse assign_wh[s, k], -1 marks a
+    free slot and K grows when a store needs another slot. load and count are
+    the per-warehouse load and number of served stores, open flags the
+    warehouses with count > 0.
+
+    conflicts[s, w] counts the stores served by warehouse w that are
+    incompatible with store s, so "may s go to w" is a single lookup. It is
+    updated whenever a store joins or leaves a warehouse, is not copied with
+    the solution and is rebuilt from the slot arrays on first use.
+
+    delta_move / delta_swap answer "what would this change cost" in O(1),
+    including the fixed cost of opening an empty warehouse or closing one
+    that loses its last store. Store and warehouse ids are 1-based, arrays
+    are indexed by id - 1.
+    """
+    __slots__ = ('data', 'assign_wh', 'assign_qty', 'load', 'count', 'open', 'objective', '_conflicts')
+
+    def __init__(self, data, store_assignments=None, slots=1):
+        self.data = data
+        if store_assignments:
+            slots = max(slots, max(len(a) for a in store_assignments.values()))
+        self.assign_wh = np.full((data.num_stores, slots), -1, dtype=np.int32)
+        self.assign_qty = np.zeros((data.num_stores, slots), dtype=np.int32)
+        self.load = np.zeros(data.num_warehouses, dtype=np.int64)
+        self.count = np.zeros(data.num_warehouses, dtype=np.int32)
+        self.open = np.zeros(data.num_warehouses, dtype=np.bool_)
+        self.objective = 0
+        self._conflicts = None
+
+        if store_assignments:
+            for store_id, assigns in store_assignments.items():
+                for w_id, qty in assigns:
+                    self._add(store_id - 1, w_id - 1, qty)
+            self.objective = self.full_cost()
+
+    @staticmethod
+    def from_slots(data, assign_wh, assign_qty):
+        """Rebuild the full state from slot arrays, e.g. ones returned by a worker process"""
+        engine = CostEngine.__new__(CostEngine)
+        engine.data = data
+        engine.assign_wh = np.array(assign_wh, dtype=np.int32)
+        engine.assign_qty = np.array(assign_qty, dtype=np.int32)
+        used = engine.assign_wh >= 0
+        warehouses = engine.assign_wh[used]
+        engine.load = np.bincount(warehouses, weights=engine.assign_qty[used], minlength=data.num_warehouses).astype(np.int64)
+        engine.count = np.bincount(warehouses, minlength=data.num_warehouses).astype(np.int32)
+        engine.open = engine.count > 0
+        engine._conflicts = None
+        engine.objective = engine.full_cost()
+        return engine
+
+    def copy(self):
+        engine = CostEngine.__new__(CostEngine)
+        engine.data = self.data
+        engine.assign_wh = self.assign_wh.copy()
+        engine.assign_qty = self.assign_qty.copy()
+        engine.load = self.load.copy()
+        engine.count = self.count.copy()
+        engine.open = self.open.copy()
+        engine.objective = self.objective
+        engine._conflicts = None
+        return engine
+
+    def nbytes(self):
+        """Memory held by the solution arrays"""
+        return sum(a.nbytes for a in (self.assign_wh, self.assign_qty, self.load, self.count, self.open))
+
+    @property
+    def conflicts(self):
+        if self._conflicts is None:
+            self._conflicts = self._build_conflicts()
+        return self._conflicts
+
+    def _build_conflicts(self):
+        degree = np.diff(self.data.incompat_csr[0])
+        dtype = np.int16 if degree.max(initial=0) < np.iinfo(np.int16).max else np.int32
+        conflicts = np.zeros((self.data.num_stores, self.data.num_warehouses), dtype=dtype)
+
+        stores, slots = np.nonzero(self.assign_wh >= 0)
+        warehouses = self.assign_wh[stores, slots]
+        # every store served by w blocks w for each of its incompatible neighbours
+        neighbours, counts = self.data.incompatible_neighbors_of(stores)
+        np.add.at(conflicts, (neighbours, np.repeat(warehouses, counts)), 1)
+        return conflicts
+
+    def full_cost(self):
+        """Objective recomputed from the slot arrays"""
+        stores, slots = np.nonzero(self.assign_wh >= 0)
+        warehouses = self.assign_wh[stores, slots]
+        supply = (self.data.supply_cost[stores, warehouses] * self.assign_qty[stores, slots]).sum()
+        return int(supply) + int(self.data.fixed_cost[np.unique(warehouses)].sum())
+
+    def _slot(self, s, w):
+        for k, x in enumerate(self.assign_wh[s].tolist()):
+            if x == w:
+                return k
+        return -1
+
+    def _grow(self):
+        rows = self.data.num_stores
+        self.assign_wh = np.hstack([self.assign_wh, np.full((rows, 1), -1, dtype=np.int32)])
+        self.assign_qty = np.hstack([self.assign_qty, np.zeros((rows, 1), dtype=np.int32)])
+
+    def _add(self, s, w, qty):
+        k = self._slot(s, w)
+        if k < 0:
+            k = self._slot(s, -1)
+            if k < 0:
+                k = self.assign_wh.shape[1]
+                self._grow()
+            self.assign_wh[s, k] = w
+            self.count[w] += 1
+            self.open[w] = True
+            if self._conflicts is not None:
+                self._conflicts[self.data.incompatible_neighbors(s + 1), w] += 1
+        self.assign_qty[s, k] += qty
+        self.load[w] += qty
+
+    def _remove(self, s, w, qty):
+        k = self._slot(s, w)
+        self.assign_qty[s, k] -= qty
+        if self.assign_qty[s, k] == 0:
+            self.assign_wh[s, k] = -1
+            self.count[w] -= 1
+            self.open[w] = self.count[w] > 0
+            if self._conflicts is not None:
+                self._conflicts[self.data.incompatible_neighbors(s + 1), w] -= 1
+        self.load[w] -= qty
+
+    def _quantity(self, s, w):
+        k = self._slot(s, w)
+        return int(self.assign_qty[s, k]) if k >= 0 else 0
+
+    def quantity(self, store_id, w_id):
+        return self._quantity(store_id - 1, w_id - 1)
+
+    def assignments(self, store_id):
+        """(w_id, qty) pairs serving store_id"""
+        s = store_id - 1
+        return [(w + 1, q) for w, q in zip(self.assign_wh[s].tolist(), self.assign_qty[s].tolist()) if w >= 0]
+
+    def all_assignments(self, store_ids=None):
+        """(store_ids, w_ids, qtys) arrays of every assignment, ordered by store; only those of store_ids if given"""
+        if store_ids is None:
+            stores, slots = np.nonzero(self.assign_wh >= 0)
+        else:
+            rows = np.asarray(store_ids, dtype=np.int64) - 1
+            picked, slots = np.nonzero(self.assign_wh[rows] >= 0)
+            stores = rows[picked]
+        return stores + 1, self.assign_wh[stores, slots].astype(np.int64) + 1, self.assign_qty[stores, slots].astype(np.int64)
+
+    def members(self, w_id):
+        """1-based ids of the stores served by w_id"""
+        return np.flatnonzero((self.assign_wh == w_id - 1).any(axis=1)) + 1
+
+    def remaining(self):
+        """Remaining capacity of every warehouse as a vector"""
+        return self.data.capacity - self.load
+
+    def is_open(self, w_id):
+        return bool(self.open[w_id - 1])
+
+    def blocked(self, store_id):
+        """Boolean vector of the warehouses serving a store incompatible with store_id"""
+        return self.conflicts[store_id - 1] > 0
+
+    def is_compatible(self, store_id, w_id):
+        return self.conflicts[store_id - 1, w_id - 1] == 0
+
+    def feasible_targets(self, store_id, qty, exclude=None):
+        """
+        0-based warehouses that can take qty more units of store_id without
+        breaking capacity or incompatibilities. The store's candidate list is
+        searched first; all warehouses are scanned only when none of them fits.
+        """
+        s = store_id - 1
+        candidates = self.data.candidate_lists()
+        if candidates is not None:
+            targets = candidates[s]
+            fits = (self.data.capacity[targets] - self.load[targets] >= qty) & (self.conflicts[s, targets] == 0)
+            if exclude is not None:
+                fits &= targets != exclude
+            if fits.any():
+                return targets[fits]
+
+        fits = (self.remaining() >= qty) & ~self.blocked(store_id)
+        if exclude is not None:
+            fits[exclude] = False
+        return np.flatnonzero(fits)
+
+    def _fits(self, s, w, qty):
+        return self.data.capacity[w] - self.load[w] >= qty and self.conflicts[s, w] == 0
+
+    def random_target(self, store_id, qty, randrange, exclude=None, probes=8):
+        """
+        Uniformly random warehouse (0-based) of feasible_targets(store_id, qty,
+        exclude), or -1 if there is none. Up to probes random entries of the
+        candidate list are checked one by one in O(1); the feasible set is
+        only built when all of them miss. randrange is e.g. random.randrange.
+        """
+        s = store_id - 1
+        candidates = self.data.candidate_lists()
+        if candidates is not None:
+            row = candidates[s]
+            for _ in range(probes):
+                w = int(row[randrange(len(row))])
+                if w != exclude and self._fits(s, w, qty):
+                    return w
+        targets = self.feasible_targets(store_id, qty, exclude)
+        return int(targets[randrange(len(targets))]) if len(targets) else -1
+
+    def cheapest_target(self, store_id, qty, exclude=None):
+        """
+        Cheapest warehouse (0-based) of feasible_targets(store_id, qty,
+        exclude), ties by id, or -1: the first one that fits in the store's
+        cost order, so the scan stops as soon as one is found.
+        """
+        s = store_id - 1
+        candidates = self.data.candidate_lists()
+        if candidates is not None:
+            for w in candidates[s].tolist():
+                if w != exclude and self._fits(s, w, qty):
+                    return w
+        order = self.data.cost_order[s]
+        fits = (self.data.capacity[order] - self.load[order] >= qty) & (self.conflicts[s, order] == 0)
+        if exclude is not None:
+            fits &= order != exclude
+        first = np.flatnonzero(fits)
+        return int(order[first[0]]) if len(first) else -1
+
+    def delta_move(self, store_id, w_from, w_to, qty):
+        """Objective change of moving qty units of store_id from w_from to w_to"""
+        if w_from == w_to:
+            return 0
+        s, f, t = store_id - 1, w_from - 1, w_to - 1
+        cost = self.data.supply_cost
+        delta = qty * (int(cost[s, t]) - int(cost[s, f]))
+        if self.count[f] == 1 and self._quantity(s, f) == qty:
+            delta -= int(self.data.fixed_cost[f])
+        if self.count[t] == 0:
+            delta += int(self.data.fixed_cost[t])
+        return delta
+
+    def move_deltas(self, store_id, w_from, qty, targets=None):
+        """
+        delta_move for many target warehouses at once: every warehouse
+        (index w_id - 1) or the 0-based indices in targets.
+        """
+        s, f = store_id - 1, w_from - 1
+        if targets is None:
+            targets = slice(None)
+        deltas = qty * (self.data.supply_cost[s, targets] - self.data.supply_cost[s, f])
+        deltas += np.where(self.open[targets], 0, self.data.fixed_cost[targets])
+        if self.count[f] == 1 and self._quantity(s, f) == qty:
+            deltas -= self.data.fixed_cost[f]
+        if isinstance(targets, slice):
+            deltas[f] = 0
+        else:
+            deltas[targets == f] = 0
+        return deltas
+
+    def delta_swap(self, s1, w1, q1, s2, w2, q2):
+        """
+        Objective change of exchanging warehouses between two assignments:
+        s1 sends its q1 units from w1 to w2 and s2 sends its q2 units from w2 to w1.
+        Both warehouses receive a store, so neither opens nor closes and only
+        supply costs change.
+        """
+        cost = self.data.supply_cost
+        return (q1 * (int(cost[s1 - 1, w2 - 1]) - int(cost[s1 - 1, w1 - 1])) +
+                q2 * (int(cost[s2 - 1, w1 - 1]) - int(cost[s2 - 1, w2 - 1])))
+
+    def swap_deltas(self, s1, w1, q1, stores, warehouses, quantities):
+        """delta_swap of (s1, w1, q1) against many (s2, w2, q2) assignments given as 1-based id arrays"""
+        cost = self.data.supply_cost
+        w2 = warehouses - 1
+        return (q1 * (cost[s1 - 1, w2] - cost[s1 - 1, w1 - 1]) +
+                quantities * (cost[stores - 1, w1 - 1] - cost[stores - 1, w2]))
+
+    def apply_assign(self, store_id, w_id, qty):
+        """Add qty units from w_id to store_id, e.g. while constructing a solution"""
+        w = w_id - 1
+        delta = qty * int(self.data.supply_cost[store_id - 1, w])
+        if not self.open[w]:
+            delta += int(self.data.fixed_cost[w])
+        self._add(store_id - 1, w, qty)
+        self.objective += delta
+        return delta
+
+    def apply_move(self, store_id, w_from, w_to, qty):
+        delta = self.delta_move(store_id, w_from, w_to, qty)
+        self._remove(store_id - 1, w_from - 1, qty)
+        self._add(store_id - 1, w_to - 1, qty)
+        self.objective += delta
+        return delta
+
+    def apply_swap(self, s1, w1, q1, s2, w2, q2):
+        delta = self.delta_swap(s1, w1, q1, s2, w2, q2)
+        self._remove(s1 - 1, w1 - 1, q1)
+        self._remove(s2 - 1, w2 - 1, q2)
+        self._add(s1 - 1, w2 - 1, q1)
+        self._add(s2 - 1, w1 - 1, q2)
+        self.objective += delta
+        return delta
@@ -0,0 +1,124 @@
+import hashlib
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+from models import solution_io
+from models import validator
+
+
+DEFAULT_ARCHIVE_SIZE = 5
+
+
+class EliteArchive:
+    """
+    On-disk archive of the best distinct solutions found for each instance.
+
+    Every instance has its own directory holding up to size solutions in the
+    binary .npz form of solution_io, named {cost}-{digest}.npz so that the
+    directory listing alone orders them and identical solutions are stored
+    once. Archived costs are only a hint: solutions are re-read, re-costed
+    and validated against the current InstanceData before they are used, so
+    entries left over from a changed instance are skipped.
+    """
+    def __init__(self, archive_dir, size=DEFAULT_ARCHIVE_SIZE):
+        self.archive_dir = archive_dir
+        self.size = size
+
+    def path(self, instance):
+        return os.path.join(self.archive_dir, instance)
+
+    def entries(self, instance):
+        """File paths of the archived solutions of an instance, cheapest first by recorded cost"""
+        entry = self.path(instance)
+        if not os.path.isdir(entry):
+            return []
+        names = [name for name in os.listdir(entry)
+                 if name.endswith(solution_io.BINARY_SUFFIX) and not name.startswith('.')]
+        names.sort(key=lambda name: (int(name.split('-', 1)[0]), name))
+        return [os.path.join(entry, name) for name in names]
+
+    def add(self, instance, solution):
+        """
+        Archive a solution unless it is already there. The archive is then
+        cut back to its size cheapest entries.
+        Returns: True if the solution was kept
+        """
+        stores, warehouses, quantities = solution.cost_engine().all_assignments()
+        # sorted by (store, warehouse), so the slot order within a store does not change the digest
+        order = np.lexsort((warehouses, stores))
+        triples = np.column_stack([stores, warehouses, quantities])[order].astype(np.int64)
+        digest = hashlib.sha1(triples.tobytes())
+        name = f"{solution.compute_fitness()}-{digest.hexdigest()[:16]}{solution_io.BINARY_SUFFIX}"
+        entry = self.path(instance)
+        target = os.path.join(entry, name)
+
+        if not os.path.exists(target):
+            os.makedirs(entry, exist_ok=True)
+            # written under a temporary name and renamed, so readers never see half a file
+            handle, staging = tempfile.mkstemp(prefix='.', suffix=solution_io.BINARY_SUFFIX, dir=entry)
+            os.close(handle)
+            try:
+                solution_io.write_binary(solution, staging)
+                os.replace(staging, target)
+            except OSError:
+                if os.path.exists(staging):
+                    os.remove(staging)
+                raise
+
+        entries = self.entries(instance)
+        for stale in entries[self.size:]:
+            os.remove(stale)
+        return target in entries[:self.size]
+
+    def solutions(self, instance, data):
+        """
+        The archived solutions of an instance that are valid for data, as
+        (cost, solution) pairs sorted by their cost on data. Unreadable or
+        infeasible entries are skipped.
+        """
+        valid = []
+        for path in self.entries(instance):
+            solution = load_valid(path, data)
+            if solution is not None:
+                valid.append((solution.compute_fitness(), solution))
+        valid.sort(key=lambda pair: pair[0])
+        return valid
+
+    def best(self, instance, data):
+        """Cheapest valid archived solution of an instance, or None"""
+        solutions = self.solutions(instance, data)
+        return solutions[0][1] if solutions else None
+
+
+def load_valid(filename, data):
+    """Read a saved solution and check it against data. Returns None if it is missing, unreadable or infeasible."""
+    if not os.path.exists(filename):
+        return None
+    try:
+        solution = solution_io.load_solution(filename, data)
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+    is_valid, _ = validator.validate_solution(solution, data)
+    return solution if is_valid else None
+
+
+def warm_start(data, instance, previous=None, archive=None):
+    """
+    Best earlier solution of an instance to restart the search from: the
+    cheaper of the solution file previous (e.g. the last {instance}_ILS.txt)
+    and the best entry of an EliteArchive, counting only solutions valid for
+    data. Returns None when there is none.
+    """
+    candidates = []
+    if previous is not None:
+        solution = load_valid(previous, data)
+        if solution is not None:
+            candidates.append((solution.compute_fitness(), solution))
+    if archive is not None:
+        candidates.extend(archive.solutions(instance, data)[:1])
+    if not candidates:
+        return None
+    return min(candidates, key=lambda pair: pair[0])[1]
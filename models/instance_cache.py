@@ -0,0 +1,73 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from models.instance_data import InstanceData
+
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = './.instance_cache'
+
+_ARRAYS = ('capacity', 'fixed_cost', 'demand', 'supply_cost', 'incompatible_pairs')
+
+
+class InstanceCache:
+    """
+    On-disk cache of parsed instances keyed by the SHA-256 of the .dzn content.
+
+    Each entry is a directory holding one uncompressed .npy file per array,
+    so an entry is opened with np.load(mmap_mode='r') and the cost matrix is
+    paged in from disk on demand instead of being copied into memory.
+    """
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def key(self, file_path):
+        digest = hashlib.sha256(f"v{CACHE_VERSION}:".encode())
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, key):
+        """Return the cached InstanceData for key, or None on a miss or a damaged entry"""
+        entry = self.path(key)
+        if not os.path.isdir(entry):
+            return None
+        try:
+            arrays = {name: np.load(os.path.join(entry, f"{name}.npy"), mmap_mode='r') for name in _ARRAYS}
+        except (OSError, ValueError):
+            return None
+
+        num_stores, num_warehouses = arrays['supply_cost'].shape
+        return InstanceData(
+            num_warehouses=num_warehouses,
+            num_stores=num_stores,
+            capacity=arrays['capacity'],
+            fixed_cost=arrays['fixed_cost'],
+            demand=arrays['demand'],
+            supply_cost=arrays['supply_cost'],
+            incompatible_pairs=arrays['incompatible_pairs']
+        )
+
+    def store(self, key, data):
+        """Write data under key. The entry is built in a temporary directory and renamed into place."""
+        entry = self.path(key)
+        if os.path.isdir(entry):
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f".{key}.", dir=self.cache_dir)
+        try:
+            for name in _ARRAYS:
+                np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(getattr(data, name)))
+            os.replace(staging, entry)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            if not os.path.isdir(entry):
+                raise
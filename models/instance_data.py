@@ -1,50 +1,178 @@
-from typing import List, Dict, Tuple,Set
+from functools import cached_property
+from typing import List, Dict, Set
+
+import numpy as np
+
 from models.warehouse import warehouse
 from models.store import store
 from models.supply import supply
 
+
+DEFAULT_NUM_CANDIDATES = 25
+
+
+def ranges(starts, ends):
+    """Concatenation of range(start, end) for every start/end pair, as one array"""
+    lengths = ends - starts
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(starts, lengths) + offsets
+
 class InstanceData:
+    """
+    Array-backed problem instance.
+
+    capacity, fixed_cost and demand are 1-D vectors and supply_cost is a
+    (num_stores x num_warehouses) matrix, all indexed by id - 1.
+    incompatible_pairs holds the 1-based (store, store) pairs as read from
+    the instance; the incompatibilities dict is derived from it when not
+    given. The old per-object lists (warehouses, stores, supply) are only
+    built on first access.
+
+    num_candidates is the length of the per-store candidate lists the
+    operators restrict themselves to (None scans every warehouse).
+    """
     def __init__(
         self,
         num_warehouses: int,
         num_stores: int,
-        warehouses: List[warehouse],
-        stores: List[store],
-        supply: List[supply],
-        incompatibilities: Dict[int, Set[int]] 
+        capacity: np.ndarray,
+        fixed_cost: np.ndarray,
+        demand: np.ndarray,
+        supply_cost: np.ndarray,
+        incompatibilities: Dict[int, Set[int]] = None,
+        incompatible_pairs: np.ndarray = None
     ):
-        
+
         self.num_warehouses = num_warehouses
         self.num_stores = num_stores
-        self.warehouses = warehouses
-        self.stores = stores
-        self.supply = supply
-        self.incompatibilities = incompatibilities
+        self.capacity = np.asarray(capacity, dtype=np.int64)
+        self.fixed_cost = np.asarray(fixed_cost, dtype=np.int64)
+        self.demand = np.asarray(demand, dtype=np.int64)
+        self.supply_cost = np.asarray(supply_cost, dtype=np.int64).reshape(num_stores, num_warehouses)
+        if incompatibilities is not None:
+            self.incompatibilities = incompatibilities
+        if incompatible_pairs is None:
+            incompatible_pairs = [(s1, s2) for s1, others in incompatibilities.items() for s2 in others if s1 < s2]
+        self.incompatible_pairs = np.asarray(incompatible_pairs, dtype=np.int64).reshape(-1, 2)
+        self.num_candidates = DEFAULT_NUM_CANDIDATES
+        self._candidate_lists = {}
+        self._candidate_masks = {}
+
+    @cached_property
+    def incompatibilities(self) -> Dict[int, Set[int]]:
+        incompatibilities = {s: set() for s in range(1, self.num_stores + 1)}
+        for s1, s2 in self.incompatible_pairs.tolist():
+            incompatibilities[s1].add(s2)
+            incompatibilities[s2].add(s1)
+        return incompatibilities
+
+    @cached_property
+    def incompat_csr(self):
+        """(ptr, idx) CSR form of the incompatibility graph over 0-based store indices"""
+        pairs = self.incompatible_pairs - 1
+        source = np.concatenate([pairs[:, 0], pairs[:, 1]])
+        target = np.concatenate([pairs[:, 1], pairs[:, 0]])
+        order = np.argsort(source, kind='stable')
+        ptr = np.zeros(self.num_stores + 1, dtype=np.int64)
+        np.cumsum(np.bincount(source, minlength=self.num_stores), out=ptr[1:])
+        return ptr, target[order]
+
+    def incompatible_neighbors(self, store_id) -> np.ndarray:
+        """0-based indices of the stores that cannot share a warehouse with store_id"""
+        ptr, idx = self.incompat_csr
+        return idx[ptr[store_id - 1]:ptr[store_id]]
+
+    def incompatible_neighbors_of(self, store_indices):
+        """
+        Incompatible neighbours of many 0-based stores at once: the 0-based
+        neighbours of every store in turn as one array, and how many of them
+        belong to each store
+        Returns: (neighbors, counts)
+        """
+        ptr, idx = self.incompat_csr
+        stores = np.asarray(store_indices, dtype=np.int64)
+        return idx[ranges(ptr[stores], ptr[stores + 1])], ptr[stores + 1] - ptr[stores]
+
+    def candidate_lists(self, k=None):
+        """
+        (num_stores x k) array of 0-based warehouse indices, the k cheapest
+        warehouses of each store by supply cost in ascending order. k defaults
+        to num_candidates; None is returned when that covers every warehouse.
+        """
+        k = self.num_candidates if k is None else k
+        if k is None or k >= self.num_warehouses:
+            return None
+        if k not in self._candidate_lists:
+            self._candidate_lists[k] = np.ascontiguousarray(self.cost_order[:, :k])
+        return self._candidate_lists[k]
+
+    def candidate_mask(self, k=None):
+        """
+        (num_stores x num_warehouses) boolean matrix, True where the warehouse
+        is in the store's candidate list; None when the lists cover every warehouse.
+        """
+        candidates = self.candidate_lists(k)
+        if candidates is None:
+            return None
+        k = candidates.shape[1]
+        if k not in self._candidate_masks:
+            mask = np.zeros((self.num_stores, self.num_warehouses), dtype=np.bool_)
+            np.put_along_axis(mask, candidates, True, axis=1)
+            self._candidate_masks[k] = mask
+        return self._candidate_masks[k]
+
+    @cached_property
+    def cost_order(self) -> np.ndarray:
+        """Every store's warehouses (0-based) sorted by supply cost, ties by id"""
+        return np.argsort(self.supply_cost, axis=1, kind='stable').astype(np.int32)
+
+    @cached_property
+    def warehouses(self) -> List[warehouse]:
+        return [
+            warehouse(id=i + 1, capacity=int(self.capacity[i]), fixed_cost=int(self.fixed_cost[i]))
+            for i in range(self.num_warehouses)
+        ]
+
+    @cached_property
+    def stores(self) -> List[store]:
+        return [
+            store(id=i + 1, demand=int(self.demand[i]), supply_costs=self.supply_cost[i].tolist())
+            for i in range(self.num_stores)
+        ]
+
+    @cached_property
+    def supply(self) -> List[supply]:
+        return [
+            supply(store_id=s + 1, warehouse_id=w + 1, cost=int(self.supply_cost[s, w]))
+            for s in range(self.num_stores)
+            for w in range(self.num_warehouses)
+        ]
 
     def describe(self):
         print(f"{self.num_warehouses} warehouses, {self.num_stores} stores.")
 
         print('\nWarehouse capacities and opening costs:')
-        for i, w in enumerate(self.warehouses):
-            print(f'Warehouse {i}: Capacity = {w.capacity}, Opening Cost = {w.fixed_cost}')
-        
+        for i in range(self.num_warehouses):
+            print(f'Warehouse {i}: Capacity = {self.capacity[i]}, Opening Cost = {self.fixed_cost[i]}')
+
 
         print('\nStore demands:')
-        for i, s in enumerate(self.stores):
-            print(f'Store {i} requires {s.demand} units of goods')
-        
+        for i in range(self.num_stores):
+            print(f'Store {i} requires {self.demand[i]} units of goods')
+
 
         print('\nSample supply costs (first 5 entries):')
-        for i, s in enumerate(self.supply[:5]):
-            print(f'Supply {i}: Store {s.store_id} to Warehouse {s.warehouse_id} costs {s.cost} per unit')
-        
+        for i in range(min(5, self.num_stores * self.num_warehouses)):
+            s, w = divmod(i, self.num_warehouses)
+            print(f'Supply {i}: Store {s + 1} to Warehouse {w + 1} costs {self.supply_cost[s, w]} per unit')
+
 
         print('\nStore incompatibilities:')
         for store_id, incompatible_stores in self.incompatibilities.items():
-            if incompatible_stores:  
+            if incompatible_stores:
                 incompatible_list = ', '.join(f'store {x}' for x in sorted(incompatible_stores)[:-1])
                 last_incompatible = sorted(incompatible_stores)[-1] if incompatible_stores else ''
-                
+
                 if incompatible_list:
                     print(f'Store {store_id} cannot be served with {incompatible_list}, and store {last_incompatible}.')
                 else:
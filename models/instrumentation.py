@@ -0,0 +1,113 @@
+import cProfile
+import csv
+import io
+import json
+import pstats
+import time
+
+
+class Trace:
+    """
+    Opt-in record of what an ILS run spends its time on.
+
+    Pass a Trace to iterated_local_search (or local_search) and every
+    operator call, perturbation and solution copy is counted and timed per
+    ILS iteration; iteration 0 is the initial local search. evaluations are
+    the move deltas an operator evaluated, accepted the moves it applied and
+    rejected the evaluated moves it did not apply. candidate_accepted tells
+    whether the iteration's perturbed and re-optimised solution was kept.
+    Without a trace the optimizers skip all of this behind one "is None" test.
+    """
+    def __init__(self):
+        self.iterations = []
+        self.started = time.perf_counter()
+        self.begin_iteration(0)
+
+    def begin_iteration(self, iteration):
+        self.current = {
+            'iteration': iteration,
+            'operators': {},
+            'copies': 0,
+            'copy_time': 0.0,
+            'cost': None,
+            'best_cost': None,
+            'candidate_accepted': None,
+            'elapsed': None,
+        }
+        self.iterations.append(self.current)
+        self._iteration_started = time.perf_counter()
+
+    def end_iteration(self, cost, best_cost, candidate_accepted=True):
+        self.current['cost'] = int(cost)
+        self.current['best_cost'] = int(best_cost)
+        self.current['candidate_accepted'] = candidate_accepted
+        self.current['elapsed'] = time.perf_counter() - self._iteration_started
+
+    def call(self, name, solution, function, *args, budget=None):
+        """Run function(*args) and book its time, evaluations and the moves it recorded in solution's journal"""
+        journal = solution.journal
+        moves = len(journal) if journal is not None else 0
+        evaluations = budget.evaluations if budget is not None else 0
+
+        started = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - started
+
+        accepted = len(journal) - moves if journal is not None else 0
+        evaluated = budget.evaluations - evaluations if budget is not None else 0
+        stats = self.current['operators'].setdefault(
+            name, {'calls': 0, 'time': 0.0, 'evaluations': 0, 'accepted': 0, 'rejected': 0})
+        stats['calls'] += 1
+        stats['time'] += elapsed
+        stats['evaluations'] += evaluated
+        stats['accepted'] += accepted
+        stats['rejected'] += max(0, evaluated - accepted)
+        return result
+
+    def copy(self, solution):
+        """solution.deep_copy(), counted and timed"""
+        started = time.perf_counter()
+        duplicate = solution.deep_copy()
+        self.current['copies'] += 1
+        self.current['copy_time'] += time.perf_counter() - started
+        return duplicate
+
+    def rows(self):
+        """One flat row per (iteration, operator)"""
+        rows = []
+        for record in self.iterations:
+            iteration = {key: value for key, value in record.items() if key != 'operators'}
+            for name, stats in record['operators'].items():
+                rows.append({**iteration, 'operator': name, **stats})
+            if not record['operators']:
+                rows.append(iteration)
+        return rows
+
+    def to_json(self, path):
+        with open(path, 'w') as f:
+            json.dump({'elapsed': time.perf_counter() - self.started, 'iterations': self.iterations}, f, indent=2)
+
+    def to_csv(self, path):
+        fields = ['iteration', 'operator', 'calls', 'time', 'evaluations', 'accepted', 'rejected',
+                  'copies', 'copy_time', 'cost', 'best_cost', 'candidate_accepted', 'elapsed']
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(self.rows())
+
+
+def profile(function, *args, output=None, sort='cumulative', limit=30, **kwargs):
+    """
+    Run function(*args, **kwargs) under cProfile, print the top entries and
+    optionally dump the raw stats to output for snakeviz / pstats.
+    Returns the function's result.
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(function, *args, **kwargs)
+    if output:
+        profiler.dump_stats(output)
+
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats(sort).print_stats(limit)
+    print(stream.getvalue())
+    return result
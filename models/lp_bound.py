@@ -0,0 +1,119 @@
+import math
+import time
+
+import numpy as np
+
+try:
+    from scipy import sparse
+    from scipy.optimize import linprog
+except ImportError:  # the bound is optional, everything else runs on numpy alone
+    sparse = None
+    linprog = None
+
+
+class LPRelaxation:
+    """
+    Solution of the LP relaxation of an instance.
+
+    flow is the (num_stores x num_warehouses) matrix of fractional
+    quantities, opened the fractional opening levels of the warehouses and
+    lower_bound the LP objective rounded up, a valid lower bound on the cost
+    of any integer solution since all costs are integers.
+    """
+    def __init__(self, lower_bound, objective, flow, opened, elapsed, message):
+        self.lower_bound = lower_bound
+        self.objective = objective
+        self.flow = flow
+        self.opened = opened
+        self.elapsed = elapsed
+        self.message = message
+
+    def gap(self, cost):
+        """Optimality gap of a solution with the given cost, in percent of that cost"""
+        return optimality_gap(cost, self.lower_bound)
+
+
+def available():
+    return linprog is not None
+
+
+def optimality_gap(cost, lower_bound):
+    if lower_bound is None or not cost:
+        return None
+    return (cost - lower_bound) / cost * 100
+
+
+def build_relaxation(data, incompatibility_cuts=False):
+    """
+    Sparse LP over x[s, w] (units store s gets from warehouse w, column
+    s * W + w) and y[w] in [0, 1] (warehouse w open, column S * W + w):
+
+        min   sum supply_cost[s, w] x[s, w] + sum fixed_cost[w] y[w]
+        s.t.  sum_w x[s, w] = demand[s]                      for every store
+              sum_s x[s, w] <= capacity[w] y[w]              for every warehouse
+              x[s, w] <= min(demand[s], capacity[w]) y[w]    for every pair
+
+    With incompatibility_cuts, x[a, w] / demand[a] + x[b, w] / demand[b] <= y[w]
+    is added for every incompatible pair and warehouse. It tightens the bound
+    but adds pairs x W rows, so it is off by default.
+    Returns: (c, A_ub, b_ub, A_eq, b_eq)
+    """
+    if sparse is None:
+        raise ImportError("The LP lower bound needs scipy")
+    S, W = data.num_stores, data.num_warehouses
+    n = S * W
+    x = np.arange(n).reshape(S, W)
+    y = n + np.arange(W)
+
+    c = np.concatenate([data.supply_cost.ravel(), data.fixed_cost]).astype(np.float64)
+
+    A_eq = sparse.csr_matrix((np.ones(n), (np.repeat(np.arange(S), W), x.ravel())), shape=(S, n + W))
+    b_eq = data.demand.astype(np.float64)
+
+    rows, cols, vals = [], [], []
+    # capacity: rows 0 .. W-1
+    rows += [np.tile(np.arange(W), S), np.arange(W)]
+    cols += [x.ravel(), y]
+    vals += [np.ones(n), -data.capacity.astype(np.float64)]
+    # linking: rows W .. W + n - 1
+    link = W + np.arange(n)
+    rows += [link, link]
+    cols += [x.ravel(), np.tile(y, S)]
+    vals += [np.ones(n), -np.minimum(data.demand[:, None], data.capacity[None, :]).ravel().astype(np.float64)]
+    num_rows = W + n
+
+    if incompatibility_cuts and len(data.incompatible_pairs):
+        a, b = (data.incompatible_pairs - 1).T
+        cut = num_rows + np.arange(len(a) * W).reshape(len(a), W)
+        demand = data.demand.astype(np.float64)
+        rows += [cut.ravel(), cut.ravel(), cut.ravel()]
+        cols += [x[a].ravel(), x[b].ravel(), np.tile(y, len(a))]
+        vals += [np.repeat(1 / demand[a], W), np.repeat(1 / demand[b], W), -np.ones(len(a) * W)]
+        num_rows += len(a) * W
+
+    A_ub = sparse.csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                             shape=(num_rows, n + W))
+    b_ub = np.zeros(num_rows)
+    return c, A_ub, b_ub, A_eq, b_eq
+
+
+def solve_relaxation(data, incompatibility_cuts=False, time_limit=None):
+    """
+    Solve the LP relaxation with HiGHS through scipy.optimize.linprog.
+    Returns: LPRelaxation, with lower_bound None when no optimum was reached
+    """
+    started = time.perf_counter()
+    c, A_ub, b_ub, A_eq, b_eq = build_relaxation(data, incompatibility_cuts)
+    bounds = [(0, None)] * (data.num_stores * data.num_warehouses) + [(0, 1)] * data.num_warehouses
+    options = {} if time_limit is None else {'time_limit': time_limit}
+    result = linprog(c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq, bounds=bounds, method='highs', options=options)
+    elapsed = time.perf_counter() - started
+
+    if result.status != 0:
+        return LPRelaxation(None, None, None, None, elapsed, result.message)
+
+    n = data.num_stores * data.num_warehouses
+    flow = result.x[:n].reshape(data.num_stores, data.num_warehouses)
+    # the objective is integral for every integer solution, so the bound can be rounded up
+    lower_bound = math.ceil(result.fun - 1e-6)
+    return LPRelaxation(lower_bound, result.fun, flow, result.x[n:], elapsed, result.message)
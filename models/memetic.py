@@ -0,0 +1,208 @@
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from models.budget import Budget
+from models.cost_engine import CostEngine
+from models.parallel_search import SharedInstance, attach_worker, worker_instance
+from models.solution import InitialSolution
+from Operator.warehouse_operator import move_to_cheaper_warehouse, operator_swap_store_assignments
+
+
+def batch_fitness(data, assign_wh, assign_qty):
+    """
+    Objective of a whole population at once. assign_wh / assign_qty are
+    (P x num_stores x K) slot arrays, -1 marking a free slot as in CostEngine.
+    Returns: int64 vector of P costs
+    """
+    population = assign_wh.shape[0]
+    used = assign_wh >= 0
+    warehouses = np.where(used, assign_wh, 0)
+    stores = np.arange(data.num_stores)[None, :, None]
+    supply = (data.supply_cost[stores, warehouses] * assign_qty * used).sum(axis=(1, 2))
+
+    # open[p, w]: some store of individual p uses warehouse w
+    individual = np.broadcast_to(np.arange(population)[:, None, None], assign_wh.shape)
+    opened = np.zeros((population, data.num_warehouses), dtype=np.bool_)
+    opened[individual[used], assign_wh[used]] = True
+    return supply + opened @ data.fixed_cost
+
+
+def stack(individuals):
+    """Pad (assign_wh, assign_qty) pairs to a common slot count and stack them into population arrays"""
+    slots = max(wh.shape[1] for wh, _ in individuals)
+    population_wh = np.full((len(individuals), individuals[0][0].shape[0], slots), -1, dtype=np.int32)
+    population_qty = np.zeros(population_wh.shape, dtype=np.int32)
+    for i, (wh, qty) in enumerate(individuals):
+        population_wh[i, :, :wh.shape[1]] = wh
+        population_qty[i, :, :qty.shape[1]] = qty
+    return population_wh, population_qty
+
+
+def crossover(data, parent_a, parent_b):
+    """
+    Store-wise uniform crossover. Stores are visited in random order and
+    take all assignments of a random parent, or of the other one if those
+    no longer fit (capacity or incompatibility); a store neither parent can
+    place takes its cheapest usable warehouses as in the greedy constructor.
+    Returns: InitialSolution, or None when a store cannot be served at all
+    """
+    engine = CostEngine(data)
+    conflicts = engine.conflicts  # built empty here and kept up to date as stores join
+    parents = (parent_a, parent_b)
+
+    for s in np.random.permutation(data.num_stores).tolist():
+        store_id = s + 1
+        first = random.random() < 0.5
+        placed = False
+        for wh, qty in (parents[0 if first else 1], parents[1 if first else 0]):
+            slots = [(w, q) for w, q in zip(wh[s].tolist(), qty[s].tolist()) if w >= 0]
+            if all(data.capacity[w] - engine.load[w] >= q and conflicts[s, w] == 0 for w, q in slots):
+                for w, q in slots:
+                    engine.apply_assign(store_id, w + 1, q)
+                placed = True
+                break
+        if placed:
+            continue
+
+        demand = int(data.demand[s])
+        order = data.cost_order[s]
+        room = data.capacity[order] - engine.load[order]
+        options = order[(room > 0) & (conflicts[s, order] == 0)]
+        for w in options.tolist():
+            q = min(demand, int(data.capacity[w] - engine.load[w]))
+            engine.apply_assign(store_id, w + 1, q)
+            demand -= q
+            if not demand:
+                break
+        if demand:
+            return None
+
+    return InitialSolution(data, engine)
+
+
+def improve(solution, data, rounds=10, budget=None):
+    """Local improvement with the move and swap operators until neither finds anything (at most rounds passes)"""
+    for _ in range(rounds):
+        if budget is not None and budget.expired():
+            break
+        _, moved = move_to_cheaper_warehouse(solution, data, budget)
+        _, swapped = operator_swap_store_assignments(solution, data, budget)
+        if not (moved or swapped):
+            break
+    return solution
+
+
+def _breed(data, seed, parent_a, parent_b, options, budget=None):
+    """
+    One child: crossover, mutation by perturbation, local improvement
+    (cut short when budget expires). Returns its slot arrays.
+    """
+    random.seed(seed)
+    np.random.seed(seed % (2 ** 32))
+    child = crossover(data, parent_a, parent_b)
+    if child is None:
+        child = InitialSolution(data, CostEngine.from_slots(data, *parent_a))
+    if random.random() < options['mutation_rate']:
+        child.perturbation(options['mutation_strength'], in_place=True)
+    improve(child, data, options['improvement_rounds'], budget)
+    return child.engine.assign_wh, child.engine.assign_qty
+
+
+def _breed_in_worker(seed, parent_a, parent_b, options, deadline):
+    # a Budget holds a perf_counter deadline of the parent process, so the deadline is sent as wall-clock time
+    budget = None if deadline is None else Budget(max(0.0, deadline - time.time()))
+    return _breed(worker_instance(), seed, parent_a, parent_b, options, budget)
+
+
+def _tournament(rng, costs, size):
+    contestants = rng.sample(range(len(costs)), min(size, len(costs)))
+    return min(contestants, key=lambda i: costs[i])
+
+
+def memetic_search(data, population_size=20, generations=50, offspring=None, tournament_size=3,
+                   mutation_rate=0.3, mutation_strength=0.1, improvement_rounds=10,
+                   num_workers=1, initial_solution=None, seed=None, time_limit=None, verbose=True):
+    """
+    Memetic algorithm: a genetic algorithm whose children are improved by
+    the move and swap operators before they compete.
+
+    Individuals are kept as CostEngine slot arrays and the population is
+    scored in one batch_fitness call per generation. Each generation breeds
+    offspring children (default: population_size) from tournament-selected
+    parents, and the best population_size of parents and children survive.
+    With num_workers > 1 the children of a generation are bred in a process
+    pool that maps the instance from shared memory. The initial population
+    is initial_solution (default: the cost-aware greedy construction) plus
+    perturbed and re-improved copies of it.
+    time_limit bounds the whole run: building the population and breeding
+    stop improving once it expires, and no new generation is started.
+    Returns: (best_solution, best_cost, best cost after every generation)
+    """
+    log = print if verbose else (lambda *args, **kwargs: None)
+    seed = random.randrange(2 ** 31) if seed is None else seed
+    random.seed(seed)
+    np.random.seed(seed % (2 ** 32))
+    # selection draws from its own stream, so serial and pooled breeding give the same run
+    rng = random.Random(seed)
+    budget = Budget.create(None, time_limit)
+    offspring = offspring or population_size
+    options = {
+        'mutation_rate': mutation_rate,
+        'mutation_strength': mutation_strength,
+        'improvement_rounds': improvement_rounds,
+    }
+
+    if initial_solution is None:
+        initial_solution = InitialSolution.generate_initial_solution(None, data, cost_aware=True)
+    base = improve(initial_solution.deep_copy(), data, improvement_rounds, budget)
+    individuals = [(base.engine.assign_wh, base.engine.assign_qty)]
+    while len(individuals) < population_size:
+        member = improve(base.perturbation(0.5), data, improvement_rounds, budget)
+        individuals.append((member.engine.assign_wh, member.engine.assign_qty))
+
+    costs = batch_fitness(data, *stack(individuals)).tolist()
+    history = [min(costs)]
+    log(f"Generation 0: best {history[-1]}, population {population_size}")
+
+    shared = SharedInstance(data) if num_workers and num_workers > 1 else None
+    pool = None
+    if shared is not None:
+        pool = ProcessPoolExecutor(max_workers=num_workers, initializer=attach_worker, initargs=(shared.handle,))
+    try:
+        for generation in range(1, generations + 1):
+            if budget is not None and budget.expired():
+                log(f"Stopping at generation {generation}: time limit reached")
+                break
+            started = time.perf_counter()
+            tasks = [(rng.randrange(2 ** 31),
+                      individuals[_tournament(rng, costs, tournament_size)],
+                      individuals[_tournament(rng, costs, tournament_size)])
+                     for _ in range(offspring)]
+            if pool is None:
+                children = [_breed(data, seed, a, b, options, budget) for seed, a, b in tasks]
+            else:
+                deadline = None if budget is None else time.time() + budget.remaining_time()
+                futures = [pool.submit(_breed_in_worker, seed, a, b, options, deadline) for seed, a, b in tasks]
+                children = [future.result() for future in futures]
+
+            # (mu + lambda) survival over parents and children, scored in one batch
+            candidates = individuals + children
+            candidate_costs = batch_fitness(data, *stack(candidates))
+            survivors = np.argsort(candidate_costs, kind='stable')[:population_size]
+            individuals = [candidates[i] for i in survivors.tolist()]
+            costs = candidate_costs[survivors].tolist()
+            history.append(costs[0])
+            log(f"Generation {generation}: best {costs[0]}, mean {np.mean(costs):.0f} "
+                f"({time.perf_counter() - started:.2f}s)")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if shared is not None:
+            shared.close()
+
+    best = int(np.argmin(costs))
+    best_solution = InitialSolution(data, CostEngine.from_slots(data, *individuals[best]))
+    return best_solution, costs[best], history
@@ -0,0 +1,139 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from models.cost_engine import CostEngine
+from models.instance_data import InstanceData
+from models.solution import InitialSolution
+
+
+_SHARED_ARRAYS = ('capacity', 'fixed_cost', 'demand', 'supply_cost', 'incompatible_pairs')
+
+# Instance attached by each worker process in attach_worker
+_worker_data = None
+
+
+class SharedInstance:
+    """
+    Copies the read-only instance arrays into named shared memory blocks once.
+    Workers receive only the small picklable handle and map the same blocks,
+    so the cost matrix is never pickled per task or per worker.
+    """
+    def __init__(self, data):
+        self.blocks = []
+        self.handle = {'num_candidates': data.num_candidates, 'arrays': {}}
+        try:
+            for name in _SHARED_ARRAYS:
+                array = np.ascontiguousarray(getattr(data, name))
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self.blocks.append(block)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+                self.handle['arrays'][name] = (block.name, array.shape, array.dtype.str)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_instance(handle):
+    """Build an InstanceData whose arrays are views on the shared memory blocks in handle"""
+    arrays = {}
+    blocks = []
+    for name, (block_name, shape, dtype) in handle['arrays'].items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+    num_stores, num_warehouses = arrays['supply_cost'].shape
+    data = InstanceData(
+        num_warehouses=num_warehouses,
+        num_stores=num_stores,
+        **arrays
+    )
+    data.num_candidates = handle['num_candidates']
+    data._shared_blocks = blocks  # keep the mappings alive as long as the instance
+    return data
+
+
+def attach_worker(handle):
+    """Pool initializer: attach the shared instance once per worker process, see worker_instance()"""
+    global _worker_data
+    _worker_data = attach_instance(handle)
+
+
+def worker_instance():
+    """The InstanceData attached by attach_worker in this worker process"""
+    return _worker_data
+
+
+def _run_trajectory(seed, slots, ils_options):
+    """One independent ILS trajectory in a worker process"""
+    data = worker_instance()
+    random.seed(seed)
+    np.random.seed(seed % (2 ** 32))
+    started = time.perf_counter()
+
+    if slots is None:
+        initial = InitialSolution.generate_initial_solution(None, data, cost_aware=True)
+    else:
+        initial = InitialSolution(data, CostEngine.from_slots(data, *slots))
+    initial_cost = initial.engine.objective
+
+    best_solution, best_cost, iteration_costs = initial.iterated_local_search(verbose=False, **ils_options)
+
+    stats = {
+        'seed': seed,
+        'pid': os.getpid(),
+        'initial_cost': initial_cost,
+        'best_cost': best_cost,
+        'iterations': len(iteration_costs) - 1,
+        'elapsed': time.perf_counter() - started,
+    }
+    return best_solution.engine.assign_wh, best_solution.engine.assign_qty, best_cost, stats
+
+
+def parallel_iterated_local_search(data, num_workers=None, num_runs=None, seeds=None, initial_solution=None, **ils_options):
+    """
+    Run independent ILS trajectories with different seeds in a process pool.
+
+    num_runs trajectories (default: one per worker) are started from
+    initial_solution, or from the cost-aware greedy construction when it is
+    None. ils_options are passed on to iterated_local_search.
+    Returns: (best_solution, best_cost, per-run statistics)
+    """
+    num_workers = num_workers or os.cpu_count() or 1
+    num_runs = num_runs or (len(seeds) if seeds else num_workers)
+    if seeds is None:
+        base = random.randrange(2 ** 31)
+        seeds = [base + i for i in range(num_runs)]
+
+    slots = None
+    if initial_solution is not None:
+        slots = (initial_solution.engine.assign_wh, initial_solution.engine.assign_qty)
+
+    results = []
+    with SharedInstance(data) as shared:
+        with ProcessPoolExecutor(max_workers=min(num_workers, len(seeds)),
+                                 initializer=attach_worker, initargs=(shared.handle,)) as pool:
+            futures = [pool.submit(_run_trajectory, seed, slots, ils_options) for seed in seeds]
+            for future in futures:
+                results.append(future.result())
+
+    assign_wh, assign_qty, best_cost, _ = min(results, key=lambda r: r[2])
+    best_solution = InitialSolution(data, CostEngine.from_slots(data, assign_wh, assign_qty))
+    return best_solution, best_cost, [r[3] for r in results]
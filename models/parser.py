@@ -1,133 +1,91 @@
 import re
 import sys
-from models.warehouse import warehouse  
-from models.store import store
-from models.supply import supply
+
+import numpy as np
+
 from models.instance_data import InstanceData
+from models.instance_cache import InstanceCache, DEFAULT_CACHE_DIR
+
+
+CHUNK_SIZE = 1 << 16
+
+_DECLARATION = re.compile(rb"\s*([A-Za-z_][A-Za-z0-9_]*)\s*=\s*")
+_COMMENT = re.compile(rb"%[^\n]*")
 
 
+class _ArrayReader:
+    """
+    Collects the rows of one array literal while it is streamed in.
+    Rows are separated by '|'; a 1-D array is read as a single row.
+    SupplyCost rows are written straight into a preallocated matrix once
+    the instance dimensions are known.
+    """
+    def __init__(self, name, num_rows=None, row_length=None):
+        self.name = name
+        self.row_length = row_length
+        self.num_rows = 0
+        self.row_lengths = []
+        self.parts = []
+        self.matrix = None
+        if num_rows is not None and row_length is not None:
+            self.matrix = np.empty((num_rows, row_length), dtype=np.int64)
 
-class InstanceData:
-    def __init__(self, num_warehouses, num_stores, warehouses, stores, supply, incompatibilities):
-        self.num_warehouses = num_warehouses
-        self.num_stores = num_stores
-        self.warehouses = warehouses
-        self.stores = stores
-        self.supply_data = supply
-        self.incompatibilities = incompatibilities
+    def add_rows(self, region):
+        rows = [row.strip().rstrip(b',') for row in region.split(b'|')]
+        rows = [row for row in rows if row]
+        if not rows:
+            return
+        lengths = [row.count(b',') + 1 for row in rows]
+        try:
+            values = np.fromstring(b','.join(rows), dtype=np.int64, sep=',')
+        except ValueError:
+            values = None
+        if values is None or len(values) != sum(lengths):
+            raise ValueError(f"{self.name} array not found or malformed")
+
+        if self.matrix is None:
+            self.parts.append(values)
+            self.row_lengths.extend(lengths)
+            self.num_rows += len(rows)
+            return
+
+        for length in lengths:
+            if length != self.row_length:
+                raise ValueError(f"Expected {self.row_length} supply costs per row, got {length}")
+        start = self.num_rows
+        self.num_rows += len(rows)
+        stop = min(self.num_rows, len(self.matrix))
+        if start < stop:
+            self.matrix[start:stop] = values[:(stop - start) * self.row_length].reshape(-1, self.row_length)
 
-    def describe(self):
-        # print(f"Number of Warehouses: {self.num_warehouses}")
-        # print(f"Number of Stores: {self.num_stores}")
-        # print(f"Warehouses: {self.warehouses}")
-        # print(f"Stores: {self.stores}")
-        pass
+    def values(self):
+        if not self.parts:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(self.parts)
 
 
 class WarehouseParser:
-    def __init__(self, file_path):
+    def __init__(self, file_path, cache_dir=DEFAULT_CACHE_DIR):
         self.file_path = file_path
+        self.cache = InstanceCache(cache_dir) if cache_dir else None
 
     def parse(self):
         try:
-            with open(self.file_path, 'r') as file:
-                content = file.read()
-
-                print("File content loaded successfully:")
-                 
-                warehouses_match = re.search(r"Warehouses\s*=\s*(\d+)\s*;", content)
-                stores_match = re.search(r"Stores\s*=\s*(\d+)\s*;", content)
-
-                if not warehouses_match or not stores_match:
-                    raise ValueError("Missing warehouse or store data")
-
-                num_warehouses = int(warehouses_match.group(1))
-                num_stores = int(stores_match.group(1))
-
-                # print(f"Parsed warehouses: {num_warehouses}, stores: {num_stores}")
-
-                
-                capacity = self._parse_array(content, "Capacity")
-                fixed_cost = self._parse_array(content, "FixedCost")
-                goods = self._parse_array(content, "Goods")
-
-                if len(capacity) != num_warehouses:
-                    raise ValueError(f"Expected {num_warehouses} capacity values, got {len(capacity)}")
-                if len(fixed_cost) != num_warehouses:
-                    raise ValueError(f"Expected {num_warehouses} fixed cost values, got {len(fixed_cost)}")
-                if len(goods) != num_stores:
-                    raise ValueError(f"Expected {num_stores} goods values, got {len(goods)}")
-
-                
-                supply_cost_match = re.search(r"SupplyCost\s*=\s*\[\s*([^]]+)\]\s*;", content, re.DOTALL)
-                if not supply_cost_match:
-                    raise ValueError("SupplyCost matrix not found or malformed")
-
-                supply_lines = [line.strip() for line in supply_cost_match.group(1).split('|') if line.strip()]
-                if len(supply_lines) != num_stores:
-                    raise ValueError(f"Expected {num_stores} supply cost rows, got {len(supply_lines)}")
-
-                supply_costs = []
-                for line in supply_lines:
-                    row = [int(x.strip()) for x in line.split(',') if x.strip()]
-                    if len(row) != num_warehouses:
-                        raise ValueError(f"Expected {num_warehouses} supply costs per row, got {len(row)}")
-                    supply_costs.append(row)
-
-
-                incompat_match = re.search(r"Incompatibilities\s*=\s*(\d+)\s*;", content)
-                if not incompat_match:
-                    raise ValueError("Incompatibilities count not found")
-                num_incompat = int(incompat_match.group(1))
-
-                pairs_match = re.search(r"IncompatiblePairs\s*=\s*\[\s*([^]]+)\]\s*;", content)
-                if not pairs_match:
-                    raise ValueError("IncompatiblePairs not found or malformed")
-
-                pairs_str = pairs_match.group(1)
-                pairs = []
-                for pair in pairs_str.split('|'):
-                    pair = pair.strip()
-                    if pair and pair != ' ':
-                        store1, store2 = map(int, [x.strip() for x in pair.split(',')])
-                        if store1 < 1 or store1 > num_stores or store2 < 1 or store2 > num_stores:
-                            raise ValueError(f"Invalid store ID in incompatible pair: {store1}, {store2}")
-                        pairs.append((store1, store2))
-
-                if len(pairs) != num_incompat:
-                    raise ValueError(f"Expected {num_incompat} incompatible pairs, got {len(pairs)}")
-
-                
-                incompatibilities = {s: set() for s in range(1, num_stores + 1)}
-                for s1, s2 in pairs:
-                    incompatibilities[s1].add(s2)
-                    incompatibilities[s2].add(s1)
-
-           
-                warehouses = [
-                    warehouse(id=i + 1, capacity=capacity[i], fixed_cost=fixed_cost[i])
-                    for i in range(num_warehouses)
-                ]
-
-                stores = [
-                    store(id=i + 1, demand=goods[i], supply_costs=supply_costs[i])
-                    for i in range(num_stores)
-                ]
-
-                supplies = [
-                    supply(store_id=s + 1, warehouse_id=w + 1, cost=supply_costs[s][w])
-                    for s in range(num_stores)
-                    for w in range(num_warehouses)
-                ]
-
-                return InstanceData(
-                    num_warehouses=num_warehouses,
-                    num_stores=num_stores,
-                    warehouses=warehouses,
-                    stores=stores,
-                    supply=supplies,
-                    incompatibilities=incompatibilities
-                )
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.key(self.file_path)
+                data = self.cache.load(cache_key)
+                if data is not None:
+                    return data
+
+            data = self._parse_content()
+
+            if self.cache is not None:
+                try:
+                    self.cache.store(cache_key, data)
+                except OSError as e:
+                    print(f"Could not write instance cache: {str(e)}")
+            return data
 
         except FileNotFoundError:
             print(f"File not found: {self.file_path}")
@@ -139,21 +97,190 @@ class WarehouseParser:
             print(f"Error parsing file: {str(e)}")
             sys.exit(1)
 
-    def _parse_array(self, content, name):
-        """Helper method to parse array declarations"""
-        match = re.search(rf"{name}\s*=\s*\[\s*([^]]+)\]\s*;", content)
-        if not match:
+    def _parse_content(self):
+        scalars, arrays = self._scan()
+
+        print("File content loaded successfully:")
+
+        if 'Warehouses' not in scalars or 'Stores' not in scalars:
+            raise ValueError("Missing warehouse or store data")
+
+        num_warehouses = int(scalars['Warehouses'])
+        num_stores = int(scalars['Stores'])
+
+        # print(f"Parsed warehouses: {num_warehouses}, stores: {num_stores}")
+
+
+        capacity = self._parse_array(arrays, "Capacity")
+        fixed_cost = self._parse_array(arrays, "FixedCost")
+        goods = self._parse_array(arrays, "Goods")
+
+        if len(capacity) != num_warehouses:
+            raise ValueError(f"Expected {num_warehouses} capacity values, got {len(capacity)}")
+        if len(fixed_cost) != num_warehouses:
+            raise ValueError(f"Expected {num_warehouses} fixed cost values, got {len(fixed_cost)}")
+        if len(goods) != num_stores:
+            raise ValueError(f"Expected {num_stores} goods values, got {len(goods)}")
+
+
+        supply_reader = arrays.get("SupplyCost")
+        if supply_reader is None:
+            raise ValueError("SupplyCost matrix not found or malformed")
+        if supply_reader.num_rows != num_stores:
+            raise ValueError(f"Expected {num_stores} supply cost rows, got {supply_reader.num_rows}")
+
+        supply_costs = supply_reader.matrix
+        if supply_costs is None:
+            for length in supply_reader.row_lengths:
+                if length != num_warehouses:
+                    raise ValueError(f"Expected {num_warehouses} supply costs per row, got {length}")
+            supply_costs = supply_reader.values().reshape(num_stores, num_warehouses)
+
+
+        if 'Incompatibilities' not in scalars:
+            raise ValueError("Incompatibilities count not found")
+        num_incompat = int(scalars['Incompatibilities'])
+
+        pairs_reader = arrays.get("IncompatiblePairs")
+        if pairs_reader is None:
+            raise ValueError("IncompatiblePairs not found or malformed")
+        for length in pairs_reader.row_lengths:
+            if length != 2:
+                raise ValueError(f"Expected 2 stores per incompatible pair, got {length}")
+
+        pairs = pairs_reader.values().reshape(-1, 2)
+        invalid = np.flatnonzero(((pairs < 1) | (pairs > num_stores)).any(axis=1))
+        if len(invalid):
+            store1, store2 = pairs[invalid[0]]
+            raise ValueError(f"Invalid store ID in incompatible pair: {store1}, {store2}")
+
+        if len(pairs) != num_incompat:
+            raise ValueError(f"Expected {num_incompat} incompatible pairs, got {len(pairs)}")
+
+
+        incompatibilities = {s: set() for s in range(1, num_stores + 1)}
+        for s1, s2 in pairs.tolist():
+            incompatibilities[s1].add(s2)
+            incompatibilities[s2].add(s1)
+
+        return InstanceData(
+            num_warehouses=num_warehouses,
+            num_stores=num_stores,
+            capacity=capacity,
+            fixed_cost=fixed_cost,
+            demand=goods,
+            supply_cost=supply_costs,
+            incompatibilities=incompatibilities,
+            incompatible_pairs=pairs
+        )
+
+    def _chunks(self):
+        """Yield the file in line-aligned chunks with '%' comments removed"""
+        with open(self.file_path, 'rb') as file:
+            pending = b''
+            while True:
+                chunk = file.read(CHUNK_SIZE)
+                if not chunk:
+                    if pending:
+                        yield _COMMENT.sub(b'', pending)
+                    return
+                pending += chunk
+                cut = pending.rfind(b'\n') + 1
+                if cut == 0:
+                    continue
+                lines, pending = pending[:cut], pending[cut:]
+                yield _COMMENT.sub(b'', lines) if b'%' in lines else lines
+
+    def _scan(self):
+        """
+        Single pass over the file. Scalar declarations are returned as raw
+        bytes, array declarations as _ArrayReader instances whose rows were
+        converted as soon as they were complete, so only the current chunk
+        and one partial row are held in memory at a time.
+        """
+        scalars = {}
+        arrays = {}
+        buffer = b''
+        pos = 0
+        reader = None
+        unterminated = None
+
+        for chunk in self._chunks():
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+            while True:
+                if reader is not None:
+                    close = buffer.find(b']', pos)
+                    stop = close if close >= 0 else buffer.rfind(b'|', pos)
+                    if stop < 0:
+                        break
+                    reader.add_rows(buffer[pos:stop])
+                    pos = stop + 1
+                    if close >= 0:
+                        arrays[reader.name] = reader
+                        unterminated = reader.name
+                        reader = None
+                    continue
+
+                if unterminated is not None:
+                    rest = buffer[pos:].lstrip()
+                    if not rest:
+                        break
+                    if rest[:1] != b';':
+                        raise ValueError(self._malformed_message(unterminated))
+                    pos = len(buffer) - len(rest) + 1
+                    unterminated = None
+
+                match = _DECLARATION.match(buffer, pos)
+                if match is None or match.end() == len(buffer):
+                    end = buffer.find(b';', pos)
+                    if match is None and end >= 0:
+                        pos = end + 1
+                        continue
+                    break
+
+                name = match.group(1).decode()
+                if buffer[match.end():match.end() + 1] == b'[':
+                    if name == "SupplyCost" and 'Stores' in scalars and 'Warehouses' in scalars:
+                        reader = _ArrayReader(name, int(scalars['Stores']), int(scalars['Warehouses']))
+                    else:
+                        reader = _ArrayReader(name)
+                    pos = match.end() + 1
+                    continue
+
+                end = buffer.find(b';', match.end())
+                if end < 0:
+                    break
+                scalars[name] = buffer[match.end():end].strip()
+                pos = end + 1
+
+        if reader is not None or unterminated is not None:
+            raise ValueError(self._malformed_message(reader.name if reader else unterminated))
+        return scalars, arrays
+
+    def _malformed_message(self, name):
+        if name == "SupplyCost":
+            return "SupplyCost matrix not found or malformed"
+        if name == "IncompatiblePairs":
+            return "IncompatiblePairs not found or malformed"
+        return f"{name} array not found or malformed"
+
+    def _parse_array(self, arrays, name):
+        """Helper method to fetch a scanned 1-D array declaration"""
+        reader = arrays.get(name)
+        if reader is None or reader.num_rows > 1:
             raise ValueError(f"{name} array not found or malformed")
-        return [int(x.strip()) for x in match.group(1).split(',') if x.strip()]
+        return reader.values()
 
     def write_results(self):
         triples = []
         for store_id in sorted(self.store_assignments.keys()):
             for (w_id, q) in self.store_assignments[store_id]:
                 triples.append((store_id, w_id, q))
-        
+
         with open("initial_solution.txt", "w") as f:
             f.write("{")
             f.write(", ".join(f"({s}, {w}, {q})" for s, w, q in triples))
             f.write("}")
-        print("Solution written in triple format.")
\ No newline at end of file
+        print("Solution written in triple format.")
@@ -1,171 +1,294 @@
 import random
-import copy
+
+import numpy as np
+
 from models import parser
 from models import instance_data
 from models import warehouse
 from models import store
 from models import supply
+from models.cost_engine import CostEngine
+from models.budget import Budget
+from models import solution_io
 from collections import defaultdict
 
 
 
 class InitialSolution:
-    def __init__(self, used_warehouses, unused_warehouses, store_assignments,warehouse_info, data):
-        self.used_warehouses = used_warehouses
-        self.unused_warehouses = unused_warehouses
-        self.store_assignments = store_assignments
+    """
+    A solution is a thin wrapper around its CostEngine, which holds the
+    assignment slot arrays, warehouse loads, open flags and the objective.
+    Copies only duplicate those arrays. store_assignments, warehouse_info,
+    used_warehouses and unused_warehouses are read-only views built on
+    access; change a solution through move() and swap().
+    swap_cursor is the store the swap operator resumes scanning from.
+    """
+    __slots__ = ('data', 'engine', 'journal', 'swap_cursor')
+
+    def __init__(self, data, engine=None):
         self.data = data
-        self.supply_matrix = self.convert_assignments_to_matrix()
-        self.warehouse_info = warehouse_info
-        
+        self.engine = engine if engine is not None else CostEngine(data)
+        self.journal = None
+        self.swap_cursor = 0
 
-    def write_results(self, filename="initial_solution.txt"):
-        triplets = []
-        for store_id in sorted(self.store_assignments.keys()):
-            for (w_id, q) in self.store_assignments[store_id]:
-                triplets.append((store_id, w_id, q))
+    @staticmethod
+    def from_assignments(data, store_assignments):
+        """Build a solution from a {store_id: [(w_id, qty), ...]} mapping"""
+        return InitialSolution(data, CostEngine(data, store_assignments))
+
+    @property
+    def store_assignments(self):
+        assignments = defaultdict(list)
+        stores, warehouses, quantities = self.engine.all_assignments()
+        for store_id, w_id, qty in zip(stores.tolist(), warehouses.tolist(), quantities.tolist()):
+            assignments[store_id].append((w_id, qty))
+        return assignments
+
+    @property
+    def warehouse_info(self):
+        remaining = self.engine.remaining().tolist()
+        info = {
+            w_id: {
+                'capacity': int(self.data.capacity[w_id - 1]),
+                'remaining': remaining[w_id - 1],
+                'fixed_cost': int(self.data.fixed_cost[w_id - 1]),
+                'assigned_stores': set()
+            } for w_id in range(1, self.data.num_warehouses + 1)
+        }
+        stores, warehouses, _ = self.engine.all_assignments()
+        for store_id, w_id in zip(stores.tolist(), warehouses.tolist()):
+            info[w_id]['assigned_stores'].add(store_id)
+        return info
 
-        with open(filename, "w") as f:
-            f.write("{")
-            f.write(", ".join(f"({s},{w},{q})" for s,w,q in triplets))
-            f.write("}")
+    @property
+    def used_warehouses(self):
+        return (np.flatnonzero(self.engine.open) + 1).tolist()
 
-    def convert_assignments_to_matrix(self):
-        n_stores = len(self.data.stores)
-        n_warehouses = len(self.data.warehouses)
-        matrix = [[0]*n_warehouses for _ in range(n_stores)]
-        
-        for store_id, assigns in self.store_assignments.items():
-            store_idx = store_id - 1 
-            for w_id, qty in assigns:
-                wh_idx = w_id - 1 
-                matrix[store_idx][wh_idx] = qty
-        return matrix
+    @property
+    def unused_warehouses(self):
+        return (np.flatnonzero(~self.engine.open) + 1).tolist()
 
-    def compute_fitness(self):
-        total_cost = 0
-        open_warehouses = set()
-        
+    @property
+    def supply_matrix(self):
+        return self.convert_assignments_to_matrix()
 
-        for store_id, assigns in self.store_assignments.items():
-            store_idx = store_id - 1
-            store = self.data.stores[store_idx]
-            for w_id, qty in assigns:
-                wh_idx = w_id - 1
-                total_cost += qty * store.supply_costs[wh_idx]
-                open_warehouses.add(w_id)
-        
-
-        for w_id in open_warehouses:
-            wh_idx = w_id - 1
-            total_cost += self.data.warehouses[wh_idx].fixed_cost
-            
-        return total_cost
+    def write_results(self, filename="initial_solution.txt"):
+        """Save as {(s,w,q), ...} text, or in the binary form for a .npz filename"""
+        solution_io.save_solution(self, filename)
 
     @staticmethod
-    def generate_initial_solution(input_file: str):
-        warehouse_parser = parser.WarehouseParser(input_file)
-        data = warehouse_parser.parse()
-        
-        warehouse_info = {
-            w.id: {
-                'capacity': w.capacity,
-                'remaining': w.capacity,
-                'fixed_cost': w.fixed_cost,
-                'assigned_stores': set()
-            } for w in data.warehouses
-        }
-
-        incompatibilities = data.incompatibilities
-        stores_sorted = sorted(data.stores, key=lambda s: len(incompatibilities.get(s.id, set())), reverse=True)
+    def read_results(filename, data):
+        """Load a solution saved by write_results, e.g. to warm-start a search"""
+        return solution_io.load_solution(filename, data)
 
+    def convert_assignments_to_matrix(self):
+        n_stores = self.data.num_stores
+        n_warehouses = self.data.num_warehouses
+        matrix = np.zeros((n_stores, n_warehouses), dtype=np.int64)
+
+        stores, warehouses, quantities = self.engine.all_assignments()
+        matrix[stores - 1, warehouses - 1] = quantities
+        return matrix.tolist()
+
+    def cost_engine(self):
+        """Incremental cost state of this solution"""
+        return self.engine
+
+    def move(self, store_id, w_from, w_to, qty):
+        """Move qty units of store_id from w_from to w_to"""
+        self.engine.apply_move(store_id, w_from, w_to, qty)
+        if self.journal is not None:
+            self.journal.append(('move', (store_id, w_from, w_to, qty)))
+
+    def swap(self, s1, w1, q1, s2, w2, q2):
+        """Exchange warehouses between the assignments (s1, w1, q1) and (s2, w2, q2)"""
+        self.engine.apply_swap(s1, w1, q1, s2, w2, q2)
+        if self.journal is not None:
+            self.journal.append(('swap', (s1, w1, q1, s2, w2, q2)))
+
+    def checkpoint(self):
+        """Start recording moves (if not already) and return a mark to roll back to"""
+        if self.journal is None:
+            self.journal = []
+        return len(self.journal)
+
+    def rollback(self, mark=0):
+        """Undo every move recorded after mark, newest first"""
+        journal, self.journal = self.journal, None
+        while journal and len(journal) > mark:
+            op, args = journal.pop()
+            if op == 'move':
+                store_id, w_from, w_to, qty = args
+                self.move(store_id, w_to, w_from, qty)
+            else:
+                s1, w1, q1, s2, w2, q2 = args
+                self.swap(s1, w2, q1, s2, w1, q2)
+        self.journal = journal
 
-        store_supply_options = defaultdict(list)
-        for store in data.stores:
-            for wh in data.warehouses:
-                cost = store.supply_costs[wh.id - 1]  
-                store_supply_options[store.id].append((wh.id, cost))
-            
+    def commit(self):
+        """Forget the recorded moves and stop recording"""
+        self.journal = None
 
-            store_supply_options[store.id].sort(key=lambda x: x[1])
+    def compute_fitness(self):
+        return self.engine.full_cost()
 
-        store_assignments = defaultdict(list)
+    @staticmethod
+    def generate_initial_solution(input_file: str, data=None, cost_aware=False, guide=None):
+        """
+        Greedy construction. Stores with the most incompatibilities go first
+        and take their cheapest usable warehouses until their demand is met.
+        With cost_aware=True the warehouses are ranked by unit cost plus, for a
+        warehouse that is still closed, its fixed cost spread over its capacity.
+        guide is an optional (num_stores x num_warehouses) preference such as
+        the flow of the LP relaxation (models.lp_bound); warehouses with more
+        guide for the store come first, the ranking above breaks ties.
+        """
+        if data is None:
+            warehouse_parser = parser.WarehouseParser(input_file)
+            data = warehouse_parser.parse()
         
-        for store in stores_sorted:
-            store_id = store.id
-            remaining_demand = store.demand
-            store_incompatibilities = incompatibilities.get(store_id, set())
-
-            for w_id, unit_cost in store_supply_options[store_id]:
-                if remaining_demand <= 0:
-                    break
-                    
-                wh_info = warehouse_info[w_id]
-                
-
-                if wh_info['remaining'] <= 0:
-                    continue
-                if store_incompatibilities & wh_info['assigned_stores']:
-                    continue
-                
+        engine = CostEngine(data)
+        remaining = data.capacity.copy()
 
-                alloc = min(remaining_demand, wh_info['remaining'])
-                store_assignments[store_id].append((w_id, alloc))
-                wh_info['remaining'] -= alloc
-                wh_info['assigned_stores'].add(store_id)
-                remaining_demand -= alloc
+        ptr, _ = data.incompat_csr
+        stores_sorted = np.argsort(-np.diff(ptr), kind='stable') + 1
+        cost_order = data.cost_order
 
-            if remaining_demand > 0:
-                raise ValueError(f"Store {store_id} demand not met. Remaining: {remaining_demand}")
 
-        used_warehouses = [w_id for w_id, w in warehouse_info.items() if len(w['assigned_stores']) > 0]
-        unused_warehouses = [w_id for w_id, w in warehouse_info.items() if len(w['assigned_stores']) == 0]
+        for store_id in stores_sorted.tolist():
+            demand = int(data.demand[store_id - 1])
+            usable = (remaining > 0) & ~engine.blocked(store_id)
 
-        return InitialSolution(used_warehouses, unused_warehouses, store_assignments,warehouse_info, data)
+            if cost_aware:
+                options = np.flatnonzero(usable)
+                unit_cost = data.supply_cost[store_id - 1, options] + np.where(
+                    engine.open[options], 0, data.fixed_cost[options] / data.capacity[options])
+                options = options[np.argsort(unit_cost, kind='stable')]
+            else:
+                order = cost_order[store_id - 1]
+                options = order[usable[order]]
+            if guide is not None:
+                preference = np.round(guide[store_id - 1, options], 6)
+                options = options[np.argsort(-preference, kind='stable')]
+
+            if demand <= 0:
+                continue
+
+            # Fill the ranked warehouses in order: all but the last are used up completely.
+            filled = np.cumsum(remaining[options])
+            last = int(np.searchsorted(filled, demand))
+            if last == len(options):
+                supplied = int(filled[-1]) if len(filled) else 0
+                raise ValueError(f"Store {store_id} demand not met. Remaining: {demand - supplied}")
+
+            for w_idx in options[:last].tolist():
+                engine.apply_assign(store_id, w_idx + 1, int(remaining[w_idx]))
+            rest = demand - (int(filled[last - 1]) if last else 0)
+            engine.apply_assign(store_id, int(options[last]) + 1, rest)
+            remaining[options[:last]] = 0
+            remaining[options[last]] -= rest
+
+        return InitialSolution(data, engine)
 
     def deep_copy(self):
         """Create a deep copy of the solution"""
-        return InitialSolution(
-            used_warehouses=copy.deepcopy(self.used_warehouses),
-            unused_warehouses=copy.deepcopy(self.unused_warehouses),
-            store_assignments=copy.deepcopy(self.store_assignments),
-            warehouse_info=copy.deepcopy(self.warehouse_info),
-            data=self.data  # Data doesn't need deep copy as it's read-only
-        )
-
-    def local_search(self, max_iterations=100):
+        return InitialSolution(self.data, self.engine.copy())  # Data doesn't need deep copy as it's read-only
+
+    def local_search(self, max_iterations=100, in_place=False, time_limit=None, max_evaluations=None, budget=None, trace=None,
+                     validate=False):
         """
         Local search using the existing operators
+        Moves, demand splits and swaps run every iteration, closing and
+        opening warehouses when those find nothing. The operators only apply
+        improving moves, so they work directly on the solution; with
+        in_place=True no copy is made at all.
+        time_limit (seconds) and max_evaluations (move deltas) bound the
+        search, or a shared Budget is passed in; since every applied move
+        improves, the solution at expiry is the best one found.
+        trace: optional instrumentation.Trace that books every operator call
+        The move operator keeps don't-look bits: after its first pass it only
+        re-examines the stores that the moves recorded in the journal since
+        can have given a new improving move (see stores_to_revisit).
+        validate: debug mode, the moves of every operator call are checked
+        with validator.check_since, which raises ValueError on a violation;
+        a solution that is not already recording moves is first validated in full
         Returns: (improved_solution, final_cost)
         """
-        from Operator.warehouse_operator import move_to_cheaper_warehouse, operator_swap_store_assignments
+        from Operator.warehouse_operator import (move_to_cheaper_warehouse, operator_swap_store_assignments,
+                                                 operator_split_demand, operator_close_warehouse, operator_open_warehouse,
+                                                 stores_to_revisit)
+        from models.validator import touched, check_since, validate_solution
         
-        current_solution = self.deep_copy()
-        current_cost = current_solution.compute_fitness()
+        budget = Budget.create(budget, time_limit, max_evaluations)
+        if trace is None:
+            current_solution = self if in_place else self.deep_copy()
+        else:
+            # the trace counts evaluations through the budget and applied moves through the journal
+            budget = budget if budget is not None else Budget()
+            current_solution = self if in_place else trace.copy(self)
+        recording = current_solution.journal is None
+        if validate and recording:
+            is_valid, message = validate_solution(current_solution, self.data)
+            if not is_valid:
+                raise ValueError(f"Invalid solution before local search: {message}")
+        seen = checked = current_solution.checkpoint()
+        dirty = np.ones(self.data.num_stores, dtype=np.bool_)
+
+        def run(operator, *args):
+            nonlocal checked
+            if trace is None:
+                improved = operator(current_solution, self.data, budget, *args)[1]
+            else:
+                improved = trace.call(operator.__name__, current_solution, operator,
+                                      current_solution, self.data, budget, *args, budget=budget)[1]
+            if validate:
+                checked = check_since(current_solution, self.data, checked)
+            return improved
+
+        def run_move():
+            nonlocal seen
+            journal = current_solution.journal
+            if len(journal) > seen:
+                dirty[stores_to_revisit(current_solution, self.data, *touched(journal[seen:]))] = True
+                seen = len(journal)
+            queue = np.flatnonzero(dirty) + 1
+            if not len(queue):
+                return False
+            dirty[:] = False
+            # the moves made now are picked up from the journal before the next pass
+            return run(move_to_cheaper_warehouse, queue)
+
+        current_cost = current_solution.cost_engine().objective
         no_improvement_count = 0
         max_no_improvement = 20
         
         for iteration in range(max_iterations):
+            if budget is not None and budget.expired():
+                break
             improved = False
             
             
             for _ in range(3):
-                new_sol, temp_improved = move_to_cheaper_warehouse(current_solution.deep_copy(), self.data)
-                if temp_improved:
-                    new_cost = new_sol.compute_fitness()
-                    if new_cost < current_cost:
-                        current_solution = new_sol
-                        current_cost = new_cost
-                        improved = True
+                if run_move():
+                    current_cost = current_solution.cost_engine().objective
+                    improved = True
             
            
+            if run(operator_split_demand):
+                current_cost = current_solution.cost_engine().objective
+                improved = True
+            
+            
             for _ in range(3):
-                new_sol, temp_improved = operator_swap_store_assignments(current_solution.deep_copy(), self.data)
-                if temp_improved:
-                    new_cost = new_sol.compute_fitness()
-                    if new_cost < current_cost:
-                        current_solution = new_sol
-                        current_cost = new_cost
+                if run(operator_swap_store_assignments):
+                    current_cost = current_solution.cost_engine().objective
+                    improved = True
+
+            # the warehouse neighbourhoods are dearer, only try them at a move/swap local optimum
+            if not improved:
+                for operator in (operator_close_warehouse, operator_open_warehouse):
+                    if run(operator):
+                        current_cost = current_solution.cost_engine().objective
                         improved = True
             
             if improved:
@@ -177,116 +300,122 @@ class InitialSolution:
             if no_improvement_count >= max_no_improvement:
                 break
         
+        if recording:
+            current_solution.commit()
         return current_solution, current_cost
 
-    def perturbation(self, strength=0.3):
+    def perturbation(self, strength=0.3, in_place=False):
         """
         Perturbation operator to escape local optima
         strength: percentage of assignments to perturb (0.0 to 1.0)
+        in_place: perturb this solution instead of a copy
+        Assignments are drawn straight from the engine's slot arrays (a random
+        slot of a random store, redrawn when free or already perturbed) and
+        targets are probed on the candidate lists, so the cost grows with the
+        number of perturbed assignments rather than with the instance.
         """
-        perturbed_solution = self.deep_copy()
-        
-        
-        all_assignments = []
-        for store_id, assignments in perturbed_solution.store_assignments.items():
-            for w_id, qty in assignments:
-                all_assignments.append((store_id, w_id, qty))
-        
-        
-        num_to_perturb = max(1, int(len(all_assignments) * strength))
-        assignments_to_perturb = random.sample(all_assignments, num_to_perturb)
-        
-        for store_id, old_w_id, qty in assignments_to_perturb:
-            
-            perturbed_solution.store_assignments[store_id].remove((old_w_id, qty))
-            perturbed_solution.warehouse_info[old_w_id]['remaining'] += qty
-            perturbed_solution.warehouse_info[old_w_id]['assigned_stores'].discard(store_id)
-            
-
-            store_incompatibilities = self.data.incompatibilities.get(store_id, set())
-            available_warehouses = []
-            
-            for wh in self.data.warehouses:
-                w_id = wh.id
-                if w_id == old_w_id:
-                    continue
-                    
-
-                if perturbed_solution.warehouse_info[w_id]['remaining'] >= qty:
-                    if not (store_incompatibilities & perturbed_solution.warehouse_info[w_id]['assigned_stores']):
-                        cost = qty * self.data.stores[store_id-1].supply_costs[w_id-1]
-                        available_warehouses.append((w_id, cost))
-            
-            if available_warehouses:
-                
-                if random.random() < 0.7:  
-                    new_w_id, _ = random.choice(available_warehouses)
-                else: 
-                    available_warehouses.sort(key=lambda x: x[1])
-                    new_w_id, _ = available_warehouses[0]
-                
-               
-                perturbed_solution.store_assignments[store_id].append((new_w_id, qty))
-                perturbed_solution.warehouse_info[new_w_id]['remaining'] -= qty
-                perturbed_solution.warehouse_info[new_w_id]['assigned_stores'].add(store_id)
-                
-                
-                if new_w_id in perturbed_solution.unused_warehouses:
-                    perturbed_solution.unused_warehouses.remove(new_w_id)
-                if new_w_id not in perturbed_solution.used_warehouses:
-                    perturbed_solution.used_warehouses.append(new_w_id)
-                    
-                if len(perturbed_solution.warehouse_info[old_w_id]['assigned_stores']) == 0:
-                    if old_w_id in perturbed_solution.used_warehouses:
-                        perturbed_solution.used_warehouses.remove(old_w_id)
-                    if old_w_id not in perturbed_solution.unused_warehouses:
-                        perturbed_solution.unused_warehouses.append(old_w_id)
+        perturbed_solution = self if in_place else self.deep_copy()
+        engine = perturbed_solution.engine
+        num_stores = self.data.num_stores
+
+        num_assignments = int(engine.count.sum())
+        num_to_perturb = max(1, int(num_assignments * strength))
+        seen = set()
+        # a move can merge two slots of a store, leaving fewer assignments than requested: cap the redraws
+        draws = 32 * num_to_perturb + 4 * num_stores
+
+        while len(seen) < num_to_perturb and draws:
+            draws -= 1
+            slots = engine.assign_wh.shape[1]
+            s, k = divmod(int(random.random() * num_stores * slots), slots)
+            old_w = int(engine.assign_wh[s, k])
+            if old_w < 0 or (s, k) in seen:
+                continue
+            seen.add((s, k))
+            store_id, qty = s + 1, int(engine.assign_qty[s, k])
+
+            if random.random() < 0.7:
+                new_w = engine.random_target(store_id, qty, random.randrange, exclude=old_w)
             else:
+                new_w = engine.cheapest_target(store_id, qty, exclude=old_w)
+
+            if new_w >= 0:
+                perturbed_solution.move(store_id, old_w + 1, new_w + 1, qty)
 
-                perturbed_solution.store_assignments[store_id].append((old_w_id, qty))
-                perturbed_solution.warehouse_info[old_w_id]['remaining'] -= qty
-                perturbed_solution.warehouse_info[old_w_id]['assigned_stores'].add(store_id)
-        
         return perturbed_solution
 
-    def iterated_local_search(self, max_iterations=50, perturbation_strength=0.3, local_search_iterations=100):
+    def iterated_local_search(self, max_iterations=50, perturbation_strength=0.3, local_search_iterations=100, verbose=True,
+                              time_limit=None, max_evaluations=None, budget=None, trace=None, validate=False):
+        """
+        time_limit (seconds) and max_evaluations (move deltas) bound the whole
+        run, or a Budget is passed in; when it is exhausted the best solution
+        found so far is returned.
+        trace: optional instrumentation.Trace filled with per-iteration statistics
+        validate: debug mode, every perturbation and local search move is
+        checked as it is applied (see local_search); raises ValueError on a violation
+        """
+        from models.validator import check_since
+
+        log = print if verbose else (lambda *args, **kwargs: None)
+        budget = Budget.create(budget, time_limit, max_evaluations)
+        if trace is not None and budget is None:
+            budget = Budget()
+        copy = InitialSolution.deep_copy if trace is None else trace.copy
        
-        print(f"Starting Iterated Local Search with {max_iterations} iterations...")
+        log(f"Starting Iterated Local Search with {max_iterations} iterations...")
         
 
-        current_solution, current_cost = self.local_search(local_search_iterations)
-        best_solution = current_solution.deep_copy()
+        current_solution, current_cost = self.local_search(local_search_iterations, budget=budget, trace=trace,
+                                                           validate=validate)
+        best_solution = copy(current_solution)
         best_cost = current_cost
+        if trace is not None:
+            trace.end_iteration(current_cost, best_cost)
         
         iteration_costs = [current_cost]
         no_improvement_count = 0
         max_no_improvement = max_iterations // 4 
         
-        print(f"Initial local search result: {current_cost}")
+        log(f"Initial local search result: {current_cost}")
         
         for iteration in range(max_iterations):
+            if budget is not None and budget.expired():
+                log(f"Stopping ILS at iteration {iteration + 1}: budget exhausted after {budget.evaluations} evaluations")
+                break
 
-            perturbed_solution = current_solution.perturbation(perturbation_strength)
-            
+            # Perturb and re-optimise the current solution in place; a rejected
+            # candidate is undone from the move journal instead of being copied up front.
+            mark = current_solution.checkpoint()
+            if trace is None:
+                current_solution.perturbation(perturbation_strength, in_place=True)
+            else:
+                trace.begin_iteration(iteration + 1)
+                trace.call('perturbation', current_solution, current_solution.perturbation, perturbation_strength, True)
+            if validate:
+                check_since(current_solution, self.data, mark)
 
-            local_optimum, local_cost = perturbed_solution.local_search(local_search_iterations)
+            local_optimum, local_cost = current_solution.local_search(local_search_iterations, in_place=True, budget=budget,
+                                                                      trace=trace, validate=validate)
             
 
             if local_cost < current_cost:
-                current_solution = local_optimum
+                current_solution.commit()
                 current_cost = local_cost
                 no_improvement_count = 0
-                print(f"Iteration {iteration + 1}: Accepted new solution with cost {local_cost}")
+                log(f"Iteration {iteration + 1}: Accepted new solution with cost {local_cost}")
                 
 
                 if local_cost < best_cost:
-                    best_solution = local_optimum.deep_copy()
+                    best_solution = copy(local_optimum)
                     best_cost = local_cost
-                    print(f"*** NEW BEST SOLUTION: {best_cost} ***")
+                    log(f"*** NEW BEST SOLUTION: {best_cost} ***")
             else:
+                current_solution.rollback(mark)
                 no_improvement_count += 1
                 
             iteration_costs.append(local_cost)
+            if trace is not None:
+                trace.end_iteration(local_cost, best_cost, no_improvement_count == 0)
             
 
             if no_improvement_count > 5:
@@ -296,8 +425,8 @@ class InitialSolution:
             
            
             if no_improvement_count >= max_no_improvement:
-                print(f"Stopping ILS at iteration {iteration + 1} due to no improvement for {no_improvement_count} iterations")
+                log(f"Stopping ILS at iteration {iteration + 1} due to no improvement for {no_improvement_count} iterations")
                 break
         
-        print(f"ILS completed. Best cost: {best_cost}")
+        log(f"ILS completed. Best cost: {best_cost}")
         return best_solution, best_cost, iteration_costs
\ No newline at end of file
@@ -0,0 +1,114 @@
+import numpy as np
+
+from models.cost_engine import CostEngine
+
+
+# Assignments formatted and written per chunk
+WRITE_CHUNK = 8192
+BINARY_SUFFIX = '.npz'
+
+
+def write_triples(solution, filename, buffer_size=1 << 16):
+    """
+    Write the {(s,w,q), ...} text form of a solution. The triples are
+    formatted a chunk at a time into a buffered file, so the whole text is
+    never held in memory.
+    """
+    stores, warehouses, quantities = solution.cost_engine().all_assignments()
+    triples = np.column_stack([stores, warehouses, quantities])
+
+    with open(filename, "w", buffering=buffer_size) as f:
+        f.write("{")
+        for start in range(0, len(triples), WRITE_CHUNK):
+            if start:
+                f.write(", ")
+            chunk = triples[start:start + WRITE_CHUNK].tolist()
+            f.write(", ".join(f"({s},{w},{q})" for s, w, q in chunk))
+        f.write("}")
+
+
+def parse_triples(text):
+    """(n x 3) int64 array of the (store, warehouse, quantity) triples in a {(s,w,q), ...} text"""
+    numbers = text.translate(str.maketrans('{}()', '    ')).strip()
+    if not numbers:
+        return np.zeros((0, 3), dtype=np.int64)
+    values = np.array(numbers.replace(',', ' ').split(), dtype=np.int64)
+    if len(values) % 3:
+        raise ValueError(f"Expected (store,warehouse,quantity) triples, got {len(values)} numbers")
+    return values.reshape(-1, 3)
+
+
+def from_triples(data, triples):
+    """
+    Build a solution from 1-based (store, warehouse, quantity) rows. Repeated
+    (store, warehouse) pairs are merged; ids outside the instance raise
+    ValueError. Feasibility is not checked, see models.validator.
+    """
+    from models.solution import InitialSolution
+
+    triples = np.asarray(triples, dtype=np.int64).reshape(-1, 3)
+    stores, warehouses, quantities = triples[:, 0] - 1, triples[:, 1] - 1, triples[:, 2]
+    if len(triples):
+        if stores.min() < 0 or stores.max() >= data.num_stores:
+            raise ValueError(f"Store id out of range 1..{data.num_stores}")
+        if warehouses.min() < 0 or warehouses.max() >= data.num_warehouses:
+            raise ValueError(f"Warehouse id out of range 1..{data.num_warehouses}")
+        if quantities.min() <= 0:
+            raise ValueError("Quantities must be positive")
+
+    keys, merged = np.unique(stores * data.num_warehouses + warehouses, return_inverse=True)
+    quantities = np.bincount(merged, weights=quantities, minlength=len(keys)).astype(np.int64)
+    stores, warehouses = np.divmod(keys, data.num_warehouses)
+
+    # keys are sorted by store, so each store's rows are contiguous: slot = position within the store
+    starts = np.searchsorted(stores, stores)
+    slots = np.arange(len(keys)) - starts
+    width = int(slots.max()) + 1 if len(keys) else 1
+    assign_wh = np.full((data.num_stores, width), -1, dtype=np.int32)
+    assign_qty = np.zeros((data.num_stores, width), dtype=np.int32)
+    assign_wh[stores, slots] = warehouses
+    assign_qty[stores, slots] = quantities
+    return InitialSolution(data, CostEngine.from_slots(data, assign_wh, assign_qty))
+
+
+def read_triples(filename, data):
+    """Read a solution written by write_triples (e.g. an earlier run's output) for a warm start"""
+    with open(filename) as f:
+        return from_triples(data, parse_triples(f.read()))
+
+
+def write_binary(solution, filename):
+    """
+    Compact binary form: the triples in the narrowest unsigned integer type
+    that holds them, plus the instance shape, in a compressed .npz
+    """
+    stores, warehouses, quantities = solution.cost_engine().all_assignments()
+    triples = np.column_stack([stores, warehouses, quantities])
+    dtype = np.min_scalar_type(int(triples.max(initial=0)))
+    shape = np.array([solution.data.num_stores, solution.data.num_warehouses], dtype=np.int64)
+    with open(filename, 'wb') as f:
+        np.savez_compressed(f, triples=triples.astype(dtype), shape=shape)
+
+
+def read_binary(filename, data):
+    with np.load(filename) as archive:
+        num_stores, num_warehouses = archive['shape'].tolist()
+        if (num_stores, num_warehouses) != (data.num_stores, data.num_warehouses):
+            raise ValueError(f"Solution is for {num_stores} stores and {num_warehouses} warehouses, "
+                             f"instance has {data.num_stores} and {data.num_warehouses}")
+        return from_triples(data, archive['triples'])
+
+
+def save_solution(solution, filename):
+    """Write the binary form for .npz file names, the text form otherwise"""
+    if filename.endswith(BINARY_SUFFIX):
+        write_binary(solution, filename)
+    else:
+        write_triples(solution, filename)
+
+
+def load_solution(filename, data):
+    """Read a solution saved by save_solution"""
+    if filename.endswith(BINARY_SUFFIX):
+        return read_binary(filename, data)
+    return read_triples(filename, data)
@@ -0,0 +1,107 @@
+import numpy as np
+
+
+def _shared_warehouse(engine, pairs):
+    """
+    For 0-based store pairs (n x 2), the 0-based warehouse both stores of a
+    pair use, or -1. Compares the two slot rows of every pair, so the cost is
+    O(pairs x K^2) with K the (small) slot count.
+    """
+    a = engine.assign_wh[pairs[:, 0]]
+    b = engine.assign_wh[pairs[:, 1]]
+    clash = (a[:, :, None] == b[:, None, :]) & (a[:, :, None] >= 0)
+    rows, slots, _ = np.nonzero(clash)
+    shared = np.full(len(pairs), -1, dtype=np.int64)
+    shared[rows[::-1]] = a[rows[::-1], slots[::-1]]
+    return shared
+
+
+def _check(engine, data, stores, warehouses, pairs):
+    """Demand of stores, capacity of warehouses and incompatibility of pairs, all 0-based arrays"""
+    if len(stores):
+        served = np.where(engine.assign_wh[stores] >= 0, engine.assign_qty[stores], 0).sum(axis=1)
+        wrong = np.flatnonzero(served != data.demand[stores])
+        if len(wrong):
+            s = int(stores[wrong[0]])
+            return False, f"Store {s + 1} demand not met (required: {data.demand[s]}, got: {served[wrong[0]]})"
+
+    if len(warehouses):
+        used = engine.load[warehouses]
+        over = np.flatnonzero(used > data.capacity[warehouses])
+        if len(over):
+            w = int(warehouses[over[0]])
+            return False, f"Warehouse {w + 1} over capacity (capacity: {data.capacity[w]}, used: {used[over[0]]})"
+
+    if len(pairs):
+        shared = _shared_warehouse(engine, pairs)
+        clashes = np.flatnonzero(shared >= 0)
+        if len(clashes):
+            s1, s2 = pairs[clashes[0]] + 1
+            return False, f"Incompatible stores {s1} and {s2} both assigned to warehouse {shared[clashes[0]] + 1}"
+
+    return True, "Solution is valid"
+
+
+def validate_solution(solution, data):
+    """
+    Check demand, capacity and incompatibilities of a whole solution with
+    array operations: per-store totals from the slot arrays, per-warehouse
+    loads against capacity, and one slot-row comparison per incompatible pair.
+    The load vector is recounted from the slot arrays, so a drifted
+    incremental load is caught as well.
+    Returns: (is_valid, message)
+    """
+    engine = solution.cost_engine()
+    used = engine.assign_wh >= 0
+    load = np.bincount(engine.assign_wh[used], weights=engine.assign_qty[used], minlength=data.num_warehouses)
+    if not np.array_equal(load, engine.load):
+        return False, "Warehouse loads do not match the assignments"
+
+    return _check(engine, data, np.arange(data.num_stores), np.arange(data.num_warehouses),
+                  data.incompatible_pairs - 1)
+
+
+def touched(journal):
+    """1-based (store_ids, w_ids) arrays of everything the moves in a journal changed"""
+    stores, warehouses = set(), set()
+    for op, args in journal:
+        if op == 'move':
+            store_id, w_from, w_to, _ = args
+            stores.add(store_id)
+            warehouses.update((w_from, w_to))
+        else:
+            s1, w1, _, s2, w2, _ = args
+            stores.update((s1, s2))
+            warehouses.update((w1, w2))
+    return np.array(sorted(stores), dtype=np.int64), np.array(sorted(warehouses), dtype=np.int64)
+
+
+def validate_incremental(solution, data, store_ids, w_ids):
+    """
+    Re-check only what a set of changes can have broken, assuming the
+    solution was valid before: the demand of the touched stores, the
+    capacity of the touched warehouses and the incompatible pairs that
+    involve a touched store. store_ids / w_ids are 1-based, e.g. from touched().
+    Returns: (is_valid, message)
+    """
+    stores = np.unique(np.asarray(store_ids, dtype=np.int64)) - 1
+    warehouses = np.unique(np.asarray(w_ids, dtype=np.int64)) - 1
+
+    neighbours, counts = data.incompatible_neighbors_of(stores)
+    pairs = np.column_stack([np.repeat(stores, counts), neighbours])
+
+    return _check(solution.cost_engine(), data, stores, warehouses, pairs)
+
+
+def check_since(solution, data, mark):
+    """
+    Debug check of the moves recorded in solution.journal after mark, with
+    validate_incremental: raises ValueError on the first violation.
+    Returns: the journal length, the mark for the next check
+    """
+    journal = solution.journal
+    if len(journal) > mark:
+        is_valid, message = validate_incremental(solution, data, *touched(journal[mark:]))
+        if not is_valid:
+            raise ValueError(f"Invalid solution after {len(journal) - mark} recorded moves: {message}")
+    return len(journal)